@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the ChannelRead/ChannelWrite decorators.
+
+    FormerChannel holds verbatim copies of the former _readmethod and
+    _writemethod decorators with their _limit_test, _factor_multiply and
+    _factor_divide python loops. BenchChannel uses the current decorators. A
+    scalar write is the inner loop of every sweep step, a 1e5 element array
+    write or read is a waveform upload or a buffered read of a FIFO.
+
+    Usage: python -m pymeasure.benchmarks.case_decorators
+
+"""
+
+import ctypes
+import timeit
+import numpy as np
+from functools import wraps
+from pymeasure.case import ChannelWrite
+
+
+class BenchChannel(ChannelWrite):
+
+    @ChannelWrite._readmethod
+    def read(self):
+        return self.data
+
+    @ChannelWrite._writemethod
+    def write(self, *values):
+        pass
+
+
+def former_readmethod(readmethod):
+    @wraps(readmethod)
+    def read(self, *args, **kw):
+        values = readmethod(self, *args, **kw)
+        if self.factor:
+            values = self._factor_divide(values)
+        return values
+
+    return read
+
+
+def former_writemethod(writemethod):
+    @wraps(writemethod)
+    def write(self, *values, **kw):
+
+        # Check if value is out of limit
+        if not self._limit_test(values):
+            msg = str(values) + ' is out of limit=' + str(self.limit)
+            raise ValueError(msg)
+
+        # Multiply the value with the factor if defined
+        if self.factor:
+            values = self._factor_multiply(values)
+
+        # Execute the decorated write method
+        writemethod(self, *values, **kw)
+
+    return write
+
+
+class FormerChannel(ChannelWrite):
+    """Channel with the former decorators and helpers.
+
+    Only the factor and limit properties are shared with ChannelWrite.
+
+    """
+
+    @former_readmethod
+    def read(self):
+        return self.data
+
+    @former_writemethod
+    def write(self, *values):
+        pass
+
+    def _limit_test(self, values):
+        limit = self.limit
+
+        for value in values:
+
+            if not ((limit[0] is None or limit[0] <= value) and
+                    (limit[1] is None or limit[1] >= value)):
+                return False
+
+        return True
+
+    def _factor_divide(self, values):
+        if isinstance(values, np.ndarray):
+            values = values / self.factor
+        else:
+            values = [value / self.factor for value in values]
+
+        return values
+
+    def _factor_multiply(self, values):
+        if isinstance(values, np.ndarray):
+            values = values * self.factor
+        else:
+            values = [value * self.factor for value in values]
+
+        return values
+
+
+def usec(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main(size=100000):
+
+    array = np.linspace(-1, 1, size)
+    ctype_array = (ctypes.c_double * size)(*array)
+
+    print('{:>36} {:>12} {:>12} {:>8}'.format('case', 'former [us]', 'now [us]', 'speedup'))
+
+    for limit, factor in [((None, None), None), ((-10, 10), None), ((-10, 10), 10)]:
+        for name, value, number in [('scalar', 0.5, 100000), ('array 1e5', array, 100)]:
+            # Skip the array write of the former implementation which fails
+            # on arrays with limits
+            channels = []
+            for cls in [FormerChannel, BenchChannel]:
+                channel = cls()
+                channel.limit = limit
+                channel.factor = factor
+                channels.append(channel)
+
+            try:
+                channels[0].write(value)
+                former = usec(lambda: channels[0].write(value), number)
+            except ValueError:
+                former = float('nan')
+            now = usec(lambda: channels[1].write(value), number)
+
+            case = 'write {} limit={} factor={}'.format(name, limit[0] is not None, factor)
+            print('{:>36} {:>12.2f} {:>12.2f} {:>8.1f}'.format(case, former, now, former / now))
+
+    for name, data, number in [('[scalar]', [0.5], 100000), ('ndarray 1e5', array, 100),
+                               ('ctypes 1e5', ctype_array, 10)]:
+        channels = []
+        for cls in [FormerChannel, BenchChannel]:
+            channel = cls()
+            channel.factor = 10
+            channel.data = data
+            channels.append(channel)
+
+        former = usec(channels[0].read, number)
+        now = usec(channels[1].read, number)
+
+        case = 'read {} factor=10'.format(name)
+        print('{:>36} {:>12.2f} {:>12.2f} {:>8.1f}'.format(case, former, now, former / now))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of hdf.Dataset.add_data.
+
+    Compares the former row by row implementation (one h5py slice write per
+    row of the last dimension) with the hyperslab based add_data. The dataset
+    gets filled with blocks of several rows, which is the typical pattern of
+    a looper writing sweeps.
+
+    Usage: python -m pymeasure.benchmarks.hdf_add_data
+
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+from pymeasure import hdf
+
+
+def rowwise_add_data(dset, position, data, flush=True):
+    """Former implementation of hdf.Dataset.add_data.
+
+    """
+
+    data = np.asarray(data, dtype=dset.dtype)
+
+    size_dim0 = dset.shape[-1]
+    start = position[-1]
+    position = list(position[:-1])
+    shape = list(dset.shape[:-1])
+
+    ary1d = data[:size_dim0 - start]
+    sl = tuple(position + [slice(start, start + ary1d.size)])
+    dset[sl] = ary1d
+
+    for index in range(size_dim0 - start, data.size, size_dim0):
+        position_iter = zip(reversed(position), reversed(shape))
+        for i, (position_dim, size_dim) in enumerate(position_iter, 1):
+            if position_dim < size_dim - 1:
+                position[-i] += 1
+                break
+            else:
+                position[-i] = 0
+        else:
+            position[:] = shape
+
+        ary1d = data[index: index + size_dim0]
+        sl = tuple(position + [slice(None, ary1d.size)])
+        dset[sl] = ary1d
+
+    if flush:
+        dset.file.flush()
+
+
+def fill(filename, shape, block, method, flush, chunks):
+    with hdf.File(filename, 'w') as f:
+        dset = f.create_dataset('data', shape=shape, chunks=chunks)
+        size = int(np.prod(shape))
+        data = np.random.random(block)
+
+        start_time = time.perf_counter()
+        for start in range(0, size, block):
+            position = np.unravel_index(start, shape)
+            method(dset, position, data[:min(block, size - start)], flush)
+        return time.perf_counter() - start_time
+
+
+def main(shape=(100, 200, 200), rows=(1, 10, 200), flush=(True, False)):
+
+    size = int(np.prod(shape))
+    chunks = (1,) + tuple(shape[1:])
+    filename = os.path.join(tempfile.gettempdir(), 'pymeasure_bench.h5')
+
+    print('{:>6} {:>6} {:>12} {:>12} {:>8}'.format('rows', 'flush', 'rows [MB/s]',
+                                                    'slabs [MB/s]', 'speedup'))
+
+    try:
+        for flush_ in flush:
+            for rows_ in rows:
+                block = rows_ * shape[-1]
+
+                t_rows = fill(filename, shape, block, rowwise_add_data, flush_, chunks)
+                t_slabs = fill(filename, shape, block, hdf.Dataset.add_data, flush_, chunks)
+
+                mbytes = size * 8 / 1e6
+                print('{:>6} {:>6} {:>12.1f} {:>12.1f} {:>8.1f}'.format(
+                    rows_, str(flush_), mbytes / t_rows, mbytes / t_slabs,
+                    t_rows / t_slabs))
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the create_dataset presets.
+
+    Every sweep step writes one ADwin FIFO payload with add_data: a noisy
+    sine quantized to the 16 bit resolution of the ADwin ADCs (+-10 V). The
+    matrix shows write rate and file size of every preset for different
+    payload sizes, once for a fixed shape and once for a growable dataset
+    of unknown length.
+
+    Usage: python -m pymeasure.benchmarks.hdf_presets
+
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+from pymeasure import hdf
+
+
+def fifo_payload(points, step):
+    """ADwin like FIFO data of one step.
+
+    """
+
+    t = np.arange(points) + step * points
+    volt = 5 * np.sin(2 * np.pi * t / 1000) + np.random.normal(0, 0.05, points)
+    return np.round(volt / 20 * 2**16) * 20 / 2**16
+
+
+def write(filename, preset, steps, points, growable):
+    payloads = [fifo_payload(points, step) for step in range(4)]
+
+    with hdf.File(filename, 'w') as f:
+        if growable:
+            dset = f.create_dataset('fifo', shape=(None, points), preset=preset)
+        else:
+            dset = f.create_dataset('fifo', shape=(steps, points), preset=preset)
+
+        start_time = time.perf_counter()
+        for step in range(steps):
+            dset.add_data((step, 0), payloads[step % 4], flush=False)
+        f.flush()
+        elapsed = time.perf_counter() - start_time
+
+    return elapsed, os.path.getsize(filename)
+
+
+def main(payloads=(1000, 10000, 100000), megabytes=80):
+
+    filename = os.path.join(tempfile.gettempdir(), 'pymeasure_bench.h5')
+
+    print('{:>8} {:>9} {:>8} {:>8} {:>10} {:>8}'.format('points', 'growable', 'preset',
+                                                        'MB/s', 'file [MB]', 'ratio'))
+
+    try:
+        for points in payloads:
+            steps = int(megabytes * 1e6 / 8 / points)
+
+            for growable in [False, True]:
+                for preset in [None, 'chunked', 'lzf', 'gzip']:
+                    if growable and preset is None:
+                        continue
+
+                    elapsed, size = write(filename, preset, steps, points, growable)
+
+                    data = steps * points * 8 / 1e6
+                    print('{:>8} {:>9} {:>8} {:>8.1f} {:>10.1f} {:>8.2f}'.format(
+                        points, str(growable), str(preset), data / elapsed,
+                        size / 1e6, data * 1e6 / size))
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the Dataplot1d data handling.
+
+    Compares the former list based data path (extend, del slices and
+    np.array on every redraw) with the preallocated RingBuffer for a
+    continuously plotted trace. Every redraw adds a chunk of new points and
+    then converts the displayed data like Dataplot1d._update does.
+
+    Usage: python -m pymeasure.benchmarks.liveplot_buffer
+
+"""
+
+import timeit
+import numpy as np
+from pymeasure.ringbuffer import RingBuffer
+
+
+def list_path(length, chunks):
+    xdata = list()
+    ydata = list()
+
+    for xchunk, ychunk in chunks:
+        xdata.extend(xchunk)
+        ydata.extend(ychunk)
+
+        while len(xdata) > length:
+            del xdata[:-length]
+            del ydata[:-length]
+
+        x = np.array(xdata)
+        y = np.array(ydata)
+
+    return x, y
+
+
+def ringbuffer_path(length, chunks):
+    buffer = RingBuffer(length, rows=2)
+
+    for xchunk, ychunk in chunks:
+        buffer.extend(xchunk, ychunk)
+
+        x = np.asarray(buffer.view(0))
+        y = np.asarray(buffer.view(1))
+
+    return x, y
+
+
+def main(lengths=(int(1e4), int(1e5), int(1e6)), redraws=50, repeat=3):
+
+    print('{:>10} {:>12} {:>12} {:>8}'.format('points', 'list [ms]',
+                                               'buffer [ms]', 'speedup'))
+
+    for length in lengths:
+        # Fill the trace once and add 1% new points per redraw
+        chunk = max(length // 100, 1)
+        x = np.arange(length + redraws * chunk, dtype=np.float64)
+        y = np.random.random(x.size)
+
+        chunks = [(x[:length], y[:length])]
+        for start in range(length, x.size, chunk):
+            chunks.append((x[start:start + chunk], y[start:start + chunk]))
+
+        list_chunks = [(xc.tolist(), yc.tolist()) for xc, yc in chunks]
+
+        t_list = min(timeit.repeat(lambda: list_path(length, list_chunks),
+                                   number=1, repeat=repeat))
+        t_buffer = min(timeit.repeat(lambda: ringbuffer_path(length, chunks),
+                                     number=1, repeat=repeat))
+
+        # Time per redraw in milliseconds
+        t_list *= 1e3 / len(chunks)
+        t_buffer *= 1e3 / len(chunks)
+
+        print('{:>10} {:>12.3f} {:>12.3f} {:>8.1f}'.format(length, t_list,
+                                                         t_buffer,
+                                                         t_list / t_buffer))
+
+
+if __name__ == '__main__':
+    main()
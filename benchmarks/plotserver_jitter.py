@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the acquisition timing while live plotting.
+
+    A fixed-period acquisition loop adds points to a 1d dataplot and records
+    how late every iteration starts relative to its deadline. The loop runs
+    once with the LiveGraph in the same process (measurement thread next to
+    the Tk mainloop) and once with the PlotServer in a separate process.
+
+    Usage: python -m pymeasure.benchmarks.plotserver_jitter
+
+"""
+
+import time
+import threading
+import numpy as np
+import matplotlib as mpl
+mpl.use('TkAgg')
+
+
+def acquire(dataplot, period, points, chunk):
+    """Fixed-period loop, returns the lateness of every iteration in s.
+
+    """
+
+    lateness = np.empty(points)
+    x = np.arange(chunk, dtype=np.float64)
+
+    deadline = time.perf_counter()
+    for i in range(points):
+        deadline += period
+
+        # Emulate some computation of the measurement
+        y = np.sin(x + i)
+        dataplot.add_data(x + i * chunk, y)
+
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        lateness[i] = time.perf_counter() - deadline
+
+    return lateness
+
+
+def in_process(period, points, chunk, length):
+    import tkinter as Tk
+    from pymeasure.liveplot import LiveGraph, Dataplot1d
+
+    root = Tk.Tk()
+    root.withdraw()
+
+    graph = LiveGraph()
+    dataplot = Dataplot1d(111, length=length, continuously=True, graph=graph)
+    graph['trace'] = dataplot
+    graph.show(delay=20)
+
+    result = []
+
+    def measure():
+        result.append(acquire(dataplot, period, points, chunk))
+        root.after(0, root.quit)
+
+    thread = threading.Thread(target=measure, daemon=True)
+    root.after(500, thread.start)
+    root.mainloop()
+    root.destroy()
+
+    return result[0]
+
+
+def out_of_process(period, points, chunk, length):
+    from pymeasure.plotserver import PlotServer
+
+    with PlotServer(delay=20) as server:
+        dataplot = server.dataplot1d('trace', 111, length=length,
+                                     continuously=True)
+        time.sleep(2)
+        lateness = acquire(dataplot, period, points, chunk)
+
+    return lateness
+
+
+def main(period=1e-3, points=5000, chunk=10, length=int(1e5)):
+
+    print('{:>15} {:>10} {:>10} {:>10} {:>10}'.format('', 'mean [us]', 'std [us]',
+                                                      'p99 [us]', 'max [us]'))
+
+    for name, function in [('in process', in_process),
+                           ('out of process', out_of_process)]:
+        lateness = function(period, points, chunk, length) * 1e6
+
+        print('{:>15} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}'.format(
+            name, np.mean(lateness), np.std(lateness),
+            np.percentile(lateness, 99), np.max(lateness)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the PyVisaInstrument start up.
+
+    Opens a rack of instruments on the simulated pyvisa-sim backend, once
+    with a new resource manager per instrument like the former
+    PyVisaInstrument and once with the shared resource manager and session
+    pool. A second round re-creates all drivers, which reuses the pooled
+    sessions. The per instrument connect cost comes from connect_log.
+
+    Usage: python -m pymeasure.benchmarks.pyvisa_connect
+
+"""
+
+import time
+import pyvisa
+from pymeasure.instruments import pyvisa_instrument
+from pymeasure.instruments.pyvisa_instrument import PyVisaInstrument
+
+ADDRESSES = ['ASRL1::INSTR', 'ASRL2::INSTR', 'ASRL3::INSTR', 'ASRL4::INSTR',
+             'GPIB0::8::INSTR', 'GPIB0::9::INSTR', 'GPIB0::10::INSTR', 'GPIB0::4::INSTR',
+             'TCPIP0::localhost::inst0::INSTR', 'TCPIP0::localhost:2222::inst0::INSTR',
+             'USB0::0x1111::0x2222::0x1234::0::INSTR', 'USB0::0x1111::0x2222::0x2468::0::INSTR']
+
+
+def former(addresses):
+    resources = []
+    start_time = time.perf_counter()
+    for address in addresses:
+        rm = pyvisa.ResourceManager('@sim')
+        resources.append(rm.open_resource(address))
+    elapsed = time.perf_counter() - start_time
+
+    for resource in resources:
+        resource.close()
+
+    return elapsed
+
+
+def pooled(addresses):
+    start_time = time.perf_counter()
+    instruments = [PyVisaInstrument(address, resource_manager='@sim') for address in addresses]
+    return time.perf_counter() - start_time, instruments
+
+
+def main(addresses=ADDRESSES):
+
+    print('{} instruments'.format(len(addresses)))
+    print('{:>32} {:>10}'.format('start up', 'time [ms]'))
+
+    print('{:>32} {:>10.1f}'.format('resource manager per instrument',
+                                    former(addresses) * 1e3))
+
+    elapsed, first = pooled(addresses)
+    print('{:>32} {:>10.1f}'.format('shared manager, new sessions', elapsed * 1e3))
+
+    elapsed, second = pooled(addresses)
+    print('{:>32} {:>10.1f}'.format('shared manager, pooled sessions', elapsed * 1e3))
+
+    print()
+    print('{:>40} {:>10} {:>8}'.format('address', 'time [ms]', 'reused'))
+    for library, address, seconds, reused in pyvisa_instrument.connect_log:
+        print('{:>40} {:>10.2f} {:>8}'.format(address, seconds * 1e3, str(reused)))
+
+    for instrument in first + second:
+        instrument.close()
+
+
+if __name__ == '__main__':
+    main()
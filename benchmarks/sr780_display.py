@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*
+
+"""
+    Benchmark of the SR780 spectrum read.
+
+    A simulated SR780 answers every query after a GPIB round trip latency
+    and sends data with the GPIB transfer rate. The spectrum is read once
+    bin by bin with DSPY? like the former Spectrum.read and once with the
+    binary DSPB? block of read_display. A second simulated instrument drops
+    bytes of the first binary transfer to show the retry.
+
+    Usage: python -m pymeasure.benchmarks.sr780_display
+
+"""
+
+import time
+import numpy as np
+from pymeasure.instruments.sr780_signalanalyzer import Spectrum, read_display
+
+
+class SimulatedSR780(object):
+
+    def __init__(self, bins, latency=2e-3, rate=500e3, broken=0):
+        self.data = np.random.random(bins).astype('<f4')
+        self.latency = latency
+        self.rate = rate
+        self.broken = broken
+        self.clears = 0
+        self._display = None
+
+    def _transfer(self, nbytes):
+        time.sleep(self.latency + nbytes / self.rate)
+
+    def write(self, command):
+        self._display = command
+        self._transfer(len(command))
+
+    def query(self, command):
+        if command.startswith('DSPN?'):
+            answer = str(self.data.size)
+        elif command.startswith('DSPY?'):
+            answer = repr(float(self.data[int(command.split(',')[1])]))
+        else:
+            raise ValueError('unknown command ' + command)
+
+        self._transfer(len(command) + len(answer))
+        return answer
+
+    def read_bytes(self, count):
+        data = self.data.tobytes()
+        if self.broken:
+            self.broken -= 1
+            data = data[:count // 2]
+        self._transfer(len(data))
+        return data
+
+    def clear(self):
+        self.clears += 1
+        self._transfer(0)
+
+
+def former_read(instrument, display):
+    bins = int(instrument.query('DSPN? {}'.format(display)))
+    noise = []
+    for i in range(bins):
+        noise += [float(instrument.query('DSPY? {}, {}'.format(display, i)))]
+    return noise
+
+
+def main(resolutions=(100, 200, 400, 800)):
+
+    print('{:>6} {:>12} {:>12} {:>8} {:>14}'.format('bins', 'ascii [s]', 'binary [s]',
+                                                      'speedup', 'retry [s]'))
+
+    for bins in resolutions:
+        instrument = SimulatedSR780(bins)
+        spectrum = Spectrum(instrument, 0)
+
+        start_time = time.perf_counter()
+        ascii_data = former_read(instrument, 0)
+        t_ascii = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        binary_data = spectrum.read()
+        t_binary = time.perf_counter() - start_time
+
+        if not np.allclose(ascii_data, binary_data):
+            raise ValueError('binary and ascii data differ.')
+
+        broken = SimulatedSR780(bins, broken=1)
+        start_time = time.perf_counter()
+        read_display(broken, 0)
+        t_retry = time.perf_counter() - start_time
+
+        print('{:>6} {:>12.3f} {:>12.4f} {:>8.0f} {:>14.4f}'.format(
+            bins, t_ascii, t_binary, t_ascii / t_binary, t_retry))
+
+
+if __name__ == '__main__':
+    main()
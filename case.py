@@ -21,24 +21,82 @@
 """
 
 from pymeasure.indexdict import IndexDict
+from pymeasure.ioworker import IoWorker, ResourceProxy
 import abc
 import time
-from functools import wraps
+from functools import wraps, partial
 import math
+import asyncio
 from collections import OrderedDict
 import numpy as np
 
 
+class CachedProperty(property):
+    """Property which caches the value of the getter.
+
+    Drivers use it like property for settings which are queried from the
+    instrument. The read value is stored in the _cache dictionary of the
+    instance and returned until the cache gets cleared:
+        - by a write of any cached property of the instrument,
+        - by cache_clear() of the channel or instrument (e.g. on reset),
+        - after cache_ttl seconds if the instance defines cache_ttl.
+
+    """
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        name = getattr(self, '_name', self.fget.__name__)
+        cache = instance.__dict__.setdefault('_cache', dict())
+
+        # Return the cached value if it did not expire
+        try:
+            value, read_time = cache[name]
+        except KeyError:
+            pass
+        else:
+            ttl = getattr(instance, 'cache_ttl', None)
+            if ttl is None or time.monotonic() - read_time < ttl:
+                return value
+
+        value = super().__get__(instance, owner)
+        cache[name] = (value, time.monotonic())
+
+        return value
+
+    def __set__(self, instance, value):
+        try:
+            super().__set__(instance, value)
+        finally:
+            # Settings can depend on each other, so clear all of the
+            # instrument, also if the setter failed after the write
+            owner = getattr(instance, '_owner', None)
+            if owner is not None:
+                owner.cache_clear()
+            else:
+                instance.__dict__.pop('_cache', None)
+
+
 class Channel(object, metaclass=abc.ABCMeta):
     """Channel class of pymeasure.case.
 
     """
 
+    # Seconds until a cached property gets queried again, None for never
+    cache_ttl = None
+
     def __init__(self, name='', unit='', instr=None):
         self.name = name
         self.unit = unit
         self._instr = instr
 
+        # Instrument which contains the channel
+        self._owner = None
+
         # Define config list
         self._config = ['name', 'unit']
 
@@ -72,7 +130,22 @@ class Channel(object, metaclass=abc.ABCMeta):
     def unit(self, unit):
         self._unit = str(unit)
 
-    def config(self, load=None):
+    def cache_clear(self):
+        """Clear the values of the cached properties.
+
+        """
+        self.__dict__.pop('_cache', None)
+
+    def config(self, load=None, fresh=False):
+        """Load and return the channel configuration.
+
+        Cached properties are taken from the cache unless fresh is True.
+
+        Returns: Config of the channel.
+        """
+
+        if fresh:
+            self.cache_clear()
 
         if load:
             for attr, value in load:
@@ -90,6 +163,18 @@ class Channel(object, metaclass=abc.ABCMeta):
         """
         pass
 
+    def _run_in_executor(self, method, *args, **kwargs):
+        """Run a blocking method in the executor of the instrument.
+
+        Channels outside of an instrument use the default executor of the
+        event loop.
+
+        Returns: Awaitable of the method result.
+        """
+        executor = self._owner.executor if self._owner is not None else None
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(executor, partial(method, *args, **kwargs))
+
 
 class ChannelRead(Channel):
 
@@ -113,6 +198,17 @@ class ChannelRead(Channel):
         # Check for optional *values and call read or wirte
         return self.read(*args, **kwargs)
 
+    async def aread(self, *args, **kwargs):
+        """Asynchronous read method.
+
+        Runs the read method in the executor of the instrument, so channels
+        of different instruments are read concurrently while the calls to one
+        instrument stay in order. Drivers with native async IO can override
+        it.
+
+        """
+        return await self._run_in_executor(self.read, *args, **kwargs)
+
     # --- factor --- #
     @property
     def factor(self):
@@ -146,33 +242,28 @@ class ChannelRead(Channel):
         """Divide the values with the channel factor.
 
         This method is used by the _readmethod decorator, do not use it out-
-        side. Depending on the output (list, numpy array, ctype array, ...) of
-        the decorated read method a different implementation is might be
-        necessary.
+        side. Lists and tuples are divided in python, everything else (numpy
+        array, ctype array, ...) with one numpy division.
 
-        Returns: List with divided values.
+        Returns: List or numpy array with divided values.
         """
-        if isinstance(values, np.ndarray):
-            values = values / self.factor
+        if isinstance(values, (list, tuple)):
+            return [value / self.factor for value in values]
         else:
-            values = [value / self.factor for value in values]
-
-        return values
+            return np.asarray(values) / self.factor
 
     def _factor_multiply(self, values):
         """Factor the values with the channel factor.
 
         This method is used by the _writemethod decorator, do not use it out-
-        side.
+        side. A single array value is multiplied with one numpy operation.
 
         Returns: List with multiplied values.
         """
-        if isinstance(values, np.ndarray):
-            values = values * self.factor
+        if len(values) == 1 and isinstance(values[0], np.ndarray):
+            return [values[0] * self.factor]
         else:
-            values = [value * self.factor for value in values]
-
-        return values
+            return [value * self.factor for value in values]
 
     @classmethod
     def _readmethod(cls, readmethod):
@@ -187,13 +278,22 @@ class ChannelRead(Channel):
 
         @wraps(readmethod)
         def read(self, *args, **kw):
-            values = readmethod(self, *args, **kw)
-            if self.factor:
-                values = self._factor_divide(values)
-            return values
+            return self._finish_read(readmethod(self, *args, **kw))
 
         return read
 
+    def _finish_read(self, values):
+        """Apply the factor to the raw values of the read method.
+
+        Drivers reading several channels with one command use it to get the
+        same result as the decorated read method.
+
+        Returns: Divided values.
+        """
+        if self.factor:
+            values = self._factor_divide(values)
+        return values
+
 
 class ChannelWrite(ChannelRead):
 
@@ -221,6 +321,14 @@ class ChannelWrite(ChannelRead):
         else:
             return self.read()
 
+    async def awrite(self, *values, **kwargs):
+        """Asynchronous write method.
+
+        Runs the write method in the executor of the instrument, see aread.
+
+        """
+        return await self._run_in_executor(self.write, *values, **kwargs)
+
     # --- limit --- #
     @property
     def limit(self):
@@ -256,6 +364,16 @@ class ChannelWrite(ChannelRead):
         """
         limit = self.limit
 
+        # Nothing to test without limits
+        if limit[0] is None and limit[1] is None:
+            return True
+
+        # Test a single array value with one comparison per limit
+        if len(values) == 1 and isinstance(values[0], np.ndarray):
+            array = values[0]
+            return bool((limit[0] is None or (array >= limit[0]).all()) and
+                        (limit[1] is None or (array <= limit[1]).all()))
+
         for value in values:
 
             if not ((limit[0] is None or limit[0] <= value) and
@@ -278,19 +396,64 @@ class ChannelWrite(ChannelRead):
         @wraps(writemethod)
         def write(self, *values, **kw):
 
+            # Execute the decorated write method
+            writemethod(self, *self._prepare_write(values), **kw)
+
+        return write
+
+    def _prepare_write(self, values):
+        """Test the limit and apply the factor to the values.
+
+        Drivers writing several channels with one command use it to get the
+        same values as the decorated write method. A single scalar, the
+        write of every sweep step, is handled in plain python.
+
+        Returns: Multiplied values.
+        """
+
+        if len(values) == 1 and not isinstance(values[0], np.ndarray):
+            value = values[0]
+            low, up = self._limit
+
             # Check if value is out of limit
-            if not self._limit_test(values):
-                msg = str(values) + ' is out of limit=' + str(self.limit)
-                raise ValueError(msg)
+            if not ((low is None or low <= value) and (up is None or up >= value)):
+                raise ValueError(str(value) + ' is out of limit=' + str(self._limit))
 
             # Multiply the value with the factor if defined
-            if self.factor:
-                values = self._factor_multiply(values)
+            if self._factor:
+                return [value * self._factor]
+            return values
 
-            # Execute the decorated write method
-            writemethod(self, *values, **kw)
+        # Check if a value is out of limit
+        if not self._limit_test(values):
+            msg = str(self._limit_violation(values)) + ' is out of limit=' + str(self.limit)
+            raise ValueError(msg)
 
-        return write
+        # Multiply the value with the factor if defined
+        if self.factor:
+            values = self._factor_multiply(values)
+
+        return values
+
+    def _limit_violation(self, values):
+        """Returns: The first value outside the limit boundaries or None.
+
+        """
+        low, up = self.limit
+
+        for value in values:
+            array = np.asarray(value)
+
+            outside = np.zeros(array.shape, dtype=bool)
+            if low is not None:
+                outside |= ~(array >= low)
+            if up is not None:
+                outside |= ~(array <= up)
+
+            if outside.any():
+                return array[outside].flat[0]
+
+        return None
 
     @abc.abstractmethod
     def write(self, *values):
@@ -372,57 +535,91 @@ class ChannelStep(ChannelWrite):
         else:
             self.steprate = None
 
+    def _trajectory(self, start, stop):
+        """Precompute all steps of a ramp from start to stop.
+
+        The steps are stepsize apart, start is excluded and stop is always
+        the last step. Without stepsize the trajectory is only stop.
+
+        Returns: Numpy array of the steps.
+        """
+        stepsize = self.stepsize
+
+        # Calculate the number of points
+        try:
+            points = int(abs(stop - start) / abs(stepsize))
+        except TypeError:
+            points = 0
+
+        steps = start + math.copysign(abs(stepsize or 0), stop - start) * np.arange(1, points + 1)
+
+        # Set last step
+        if not points or steps[-1] != stop:
+            steps = np.append(steps, float(stop))
+
+        return steps
+
+    def _ramp_upload(self, values, steptime):
+        """Hook for drivers which can run a whole ramp on the instrument.
+
+        values are the factored steps of the trajectory, which are already
+        tested against the limit, and steptime the time between the steps. A
+        driver overriding this method uploads the steps, waits until the ramp
+        is finished and returns True. The write method and the module
+        function ramp use it whenever the channel ramps on its own.
+
+        Returns: NotImplemented if the ramp has to be stepped.
+        """
+        return NotImplemented
+
+    def _ramp(self, writemethod, steps, verbose=False):
+        """Write the steps of a trajectory on a monotonic timeline.
+
+        Every step n is written at the deadline start + n * steptime, so a
+        late step does not delay the following ones.
+
+        """
+
+        # Test the limit and factor the whole trajectory at once
+        values, = self._prepare_write((steps,))
+        steptime = self.steptime or 0
+
+        if len(values) > 1 and self._ramp_upload(values, steptime) is not NotImplemented:
+            return
+
+        values = values.tolist()
+        start_time = verbose_time = time.monotonic()
+
+        for n, value in enumerate(values):
+
+            # Wait for the deadline of the step
+            waiting_time = start_time + n * steptime - time.monotonic()
+            if waiting_time > 0:
+                time.sleep(waiting_time)
+
+            writemethod(self, value)
+
+            # Check verbose argument
+            if verbose:
+                # If verbose is True print every step
+                if verbose is True:
+                    print(steps[n])
+                # If verbose is a time print the current step
+                elif (time.monotonic() - verbose_time) > verbose:
+                    verbose_time = time.monotonic()
+                    print(steps[n])
+
     @classmethod
     def _writemethod(cls, writemethod):
 
-        # Decortae the writemethod
-        writemethod = super()._writemethod(writemethod)
-        #writemethod = ChannelWrite._writemethod(writemethod)
-
+        # The ramp does the limit test and factor for the whole trajectory
+        @wraps(writemethod)
         def write(self, stop, verbose=False):
-
             start, = self.read()
-            stepsize = self.stepsize
-            steptime = self.steptime
-
-            # Calculate the number of points
-            try:
-                points = int((stop - start) / stepsize)
-            except TypeError:
-                points = 0
-
-            # Return generator for negative or positive step direction
-            if math.copysign(1, points) > 0:
-                points = range(1, points + 1, 1)
-            else:
-                points = range(-1, points - 1, -1)
-
-            # Do stepping
-            last_time = verbose_time = time.time()
-
-            for step in (start + n * stepsize for n in points):
-                writemethod(self, step)
-
-                # Check verbose argument
-                if verbose:
-                    # If verbose is True print every step
-                    if verbose is True:
-                        position, = self.read()
-                        print(position)
-                    # If verbose is a time print the current step
-                    elif (time.time() - verbose_time) > verbose:
-                        verbose_time = time.time()
-                        position, = self.read()
-                        print(position)
-
-                # Calculate left waiting time and wait for it
-                waiting_time = steptime - (time.time() - last_time)
-                if waiting_time > 0:
-                    time.sleep(waiting_time)
-                last_time = time.time()
-
-            # Set last step
-            writemethod(self, stop)
+            self._ramp(writemethod, self._trajectory(start, stop), verbose)
+
+        # Write of a single prepared step, used by the module function ramp
+        write._stepmethod = writemethod
 
         return write
 
@@ -441,11 +638,13 @@ class Instrument(IndexDict):
         super().__init__()
         self._name = name
         self._instr = instr
+        self._executor = None
 
     def __setitem__(self, key, channel):
         if isinstance(channel, Channel):
             super().__setitem__(key, channel)
             channel.name = key
+            channel._owner = self
         else:
             raise TypeError('item must be a Channel')
 
@@ -461,6 +660,29 @@ class Instrument(IndexDict):
     def name(self, name):
         self._name = str(name)
 
+    @property
+    def executor(self):
+        """IoWorker of the instrument.
+
+        The async channel methods aread and awrite run in it, so all of them
+        are executed in order. With an io worker (see _start_io_worker) it
+        also executes all other traffic of the instrument.
+
+        """
+        if self._executor is None:
+            self._executor = IoWorker(name=self._name or None)
+        return self._executor
+
+    def _start_io_worker(self):
+        """Route all access of the instrument resource through the executor.
+
+        Drivers call it before they create their channels, which get the
+        proxy of the resource.
+
+        """
+        if not isinstance(self._instr, ResourceProxy):
+            self._instr = ResourceProxy(self._instr, self.executor)
+
     def channels(self):
         """List all channels in instrument.
 
@@ -468,15 +690,250 @@ class Instrument(IndexDict):
         """
         return list(self._odict.values())
 
-    def config(self):
+    # Method writing prepared values of several channels with one command
+    _write_batch = None
+
+    def write_many(self, values):
+        """Write the values of several channels.
+
+        The values are a dictionary or list of (key, value) pairs, where value
+        is a single value or a sequence of values of the channel write
+        method. Drivers which define _write_batch(pairs), taking a list of
+        (channel, prepared value) pairs, write all channels with one
+        command: stepping channels are ramped together (see ramp) and every
+        step of the common timeline is one command. Channels with several
+        values and drivers without _write_batch write the channels one by
+        one.
+
+        """
+
+        if self._write_batch is None:
+            for key, value in _pairs(values):
+                self[key].write(*_values(value))
+            return
+
+        # Channels with several values are written with their write method
+        stops = []
+        for key, value in _pairs(values):
+            value = _values(value)
+            if len(value) == 1:
+                stops.append((self[key], value[0]))
+            else:
+                self[key].write(*value)
+
+        ramp(stops)
+
+    def read_many(self, keys=None):
+        """Read several channels.
+
+        Drivers override the method to read all channels with one command.
+        This generic version reads the channels one by one.
+
+        Returns: OrderedDict with the read values of every key (all channels
+                 if keys is None).
+        """
+
+        if keys is None:
+            keys = list(self.keys())
+
+        return OrderedDict((key, self[key].read()) for key in keys)
+
+    def ramp(self, values, verbose=False):
+        """Ramp several channels concurrently.
+
+        The values are a dictionary or list of (key, stop) pairs. All
+        channels arrive together in the time of the slowest ramp, see the
+        module function ramp.
+
+        """
+        ramp([(self[key], stop) for key, stop in _pairs(values)], verbose)
+
+    def cache_clear(self):
+        """Clear the cached properties of all channels and subsystems.
+
+        Drivers call it when the instrument settings change without a write
+        of a cached property, e.g. on reset.
+
+        """
+
+        self.__dict__.pop('_cache', None)
+        for channel in self.channels():
+            channel.cache_clear()
+
+        # Subsystems of the instrument
+        for attr in list(self.__dict__.values()):
+            if '_cache' in getattr(attr, '__dict__', ()):
+                attr.__dict__.pop('_cache', None)
+
+    def config(self, fresh=False):
 
         instr_config = OrderedDict()
         for key, channel in list(self.items()):
-            instr_config[key] = channel.config()
+            instr_config[key] = channel.config(fresh=fresh)
 
         return InstrumentConfig(instr_config)
 
 
+def _pairs(values):
+    """Return the (key, value) pairs of a dictionary or list of pairs.
+
+    """
+    try:
+        return list(values.items())
+    except AttributeError:
+        return list(values)
+
+
+def _values(value):
+    """Return a single value or a sequence of values as tuple.
+
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(value)
+    else:
+        return (value,)
+
+
+def ramp(channels, verbose=False):
+    """Ramp several channels concurrently to their stop values.
+
+    The channels are a dictionary or list of (channel, stop) pairs. Every
+    ChannelStep ramp gets stretched to the duration of the slowest one, so
+    all channels arrive together. The steps of each channel stay at least
+    steptime apart and never exceed its stepsize. Channels without stepsize
+    are set at the start of the ramp.
+
+    The steps of all channels are merged into one timeline and written on
+    monotonic deadlines by the step method of the ChannelStep write
+    decorator. Steps of one instrument with the same deadline are written
+    with one command if the instrument defines _write_batch. Channels with
+    undecorated write methods are set once with their write method. All
+    limits get tested before the first step. If only one channel steps, its
+    _ramp_upload hook can run the ramp on the instrument.
+
+    """
+
+    ramps = []
+    for channel, stop in _pairs(channels):
+        write = getattr(channel, 'write', None)
+        if write is None:
+            raise TypeError('channel {} has no write method'.format(channel.name))
+
+        stepmethod = getattr(write, '_stepmethod', None)
+
+        if stepmethod is None:
+            # Undecorated write methods do their own stepping and limit test
+            values = _values(stop)
+            if isinstance(channel, ChannelWrite) and not channel._limit_test(values):
+                msg = str(channel._limit_violation(values)) + ' is out of limit='
+                raise ValueError(msg + str(channel.limit))
+            ramps.append([channel, None, stop, stop, None])
+        elif channel.stepsize:
+            start, = channel.read()
+            ramps.append([channel, stepmethod, start, stop, channel._trajectory(start, stop)])
+        else:
+            ramps.append([channel, stepmethod, stop, stop, np.array([stop], dtype=float)])
+
+    # Duration of the slowest ramp, the first step is written at once
+    duration = max([(len(steps) - 1) * (channel.steptime or 0)
+                    for channel, stepmethod, start, stop, steps in ramps if stepmethod] + [0])
+
+    times = []
+    events = []
+    prepared = dict()
+    for nr, (channel, stepmethod, start, stop, steps) in enumerate(ramps):
+
+        if stepmethod is None:
+            times.append(np.zeros(1))
+            events.append((nr, stop, stop))
+            continue
+
+        # Stretch the ramp with the steptime of the channel to the duration
+        if len(steps) > 1:
+            points = int(duration / channel.steptime + 1e-9) + 1
+            steps = start + (stop - start) * np.arange(1, points + 1) / points
+            steps[-1] = stop
+            times.append(np.linspace(0, duration, points))
+        else:
+            times.append(np.zeros(1))
+
+        # Test the limit and factor the whole trajectory at once
+        values, = channel._prepare_write((steps,))
+        events += [(nr, step, value) for step, value in zip(steps, values.tolist())]
+        prepared[nr] = values
+
+    times = np.concatenate(times)
+
+    # A channel ramping on its own can upload the ramp to the instrument,
+    # after all other channels got set
+    stepping = [nr for nr, values in prepared.items() if len(values) > 1]
+    if len(stepping) == 1:
+        nr = stepping[0]
+        channel = ramps[nr][0]
+        own = np.array([event[0] == nr for event in events], dtype=bool)
+
+        _run_timeline(ramps, times[~own], [event for event, o in zip(events, own) if not o],
+                      verbose)
+
+        if channel._ramp_upload(prepared[nr], channel.steptime or 0) is NotImplemented:
+            _run_timeline(ramps, times[own], [event for event, o in zip(events, own) if o],
+                          verbose)
+    else:
+        _run_timeline(ramps, times, events, verbose)
+
+
+def _run_timeline(ramps, times, events, verbose):
+    """Write the events (nr, step, value) of ramp at the deadlines times.
+
+    """
+
+    order = np.argsort(times, kind='stable')
+
+    # Group the events with equal deadline
+    timeline = []
+    for deadline, event in zip(times[order].tolist(), [events[i] for i in order]):
+        if timeline and timeline[-1][0] == deadline:
+            timeline[-1][1].append(event)
+        else:
+            timeline.append((deadline, [event]))
+
+    start_time = verbose_time = time.monotonic()
+
+    for deadline, group in timeline:
+
+        # Wait for the deadline of the steps
+        waiting_time = start_time + deadline - time.monotonic()
+        if waiting_time > 0:
+            time.sleep(waiting_time)
+
+        batches = OrderedDict()
+        for nr, step, value in group:
+            channel, stepmethod = ramps[nr][:2]
+            batch = getattr(getattr(channel, '_owner', None), '_write_batch', None)
+
+            if stepmethod is None:
+                channel.write(value)
+            elif batch is None:
+                stepmethod(channel, value)
+            else:
+                batches.setdefault(batch, []).append((channel, value))
+
+        for batch, pairs in batches.items():
+            batch(pairs)
+
+        # Check verbose argument
+        if verbose:
+            for nr, step, value in group:
+                channel = ramps[nr][0]
+                # If verbose is True print every step
+                if verbose is True:
+                    print(channel.name, step)
+                # If verbose is a time print the current step
+                elif (time.monotonic() - verbose_time) > verbose:
+                    verbose_time = time.monotonic()
+                    print(channel.name, step)
+
+
 class Rack(IndexDict):
     """Container class for instances of pymeasure.Channel.
 
@@ -498,6 +955,37 @@ class Rack(IndexDict):
 
         return list(self._odict.values())
 
+    def ramp(self, values, verbose=False):
+        """Ramp channels of several instruments concurrently.
+
+        The values are a dictionary or list of ((instrument key, channel key),
+        stop) pairs. All channels arrive together in the time of the slowest
+        ramp, see the module function ramp.
+
+        """
+        ramp([(self[instr][key], stop) for (instr, key), stop in _pairs(values)], verbose)
+
+    async def read_all(self, keys=None):
+        """Read channels of all instruments concurrently.
+
+        The keys are a list of (instrument key, channel key) pairs, None
+        reads every channel of every instrument. The channels of one
+        instrument are read one after another in its executor, different
+        instruments in parallel, so the time is given by the slowest
+        instrument.
+
+        Example: values = asyncio.run(rack.read_all())
+
+        Returns: OrderedDict with the read values of every key.
+        """
+
+        if keys is None:
+            keys = [(instr, key) for instr in self.keys() for key in self[instr].keys()]
+
+        values = await asyncio.gather(*[self[instr][key].aread() for instr, key in keys])
+
+        return OrderedDict(zip(keys, values))
+
 
 class Config(object):
 
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.catalog
+    -----------------
+
+    The catalog module is part of the pymeasure package. It keeps a SQLite
+    index of the attributes of all groups and datasets in a directory tree
+    of hdf files, e.g. the date and channel configs written with add_attrs.
+    Queries for attribute values and ranges get answered from the index
+    without opening any hdf file.
+
+"""
+
+from pymeasure import ftools
+from pymeasure import hdf
+
+import os
+import sqlite3
+import numpy as np
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    filename TEXT UNIQUE,
+    mtime REAL,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    path TEXT,
+    type TEXT,
+    shape TEXT,
+    dtype TEXT
+);
+CREATE TABLE IF NOT EXISTS attrs (
+    dataset_id INTEGER REFERENCES datasets(id) ON DELETE CASCADE,
+    name TEXT,
+    text TEXT,
+    min REAL,
+    max REAL
+);
+CREATE INDEX IF NOT EXISTS attrs_text ON attrs (name, text);
+CREATE INDEX IF NOT EXISTS attrs_range ON attrs (name, min, max);
+CREATE INDEX IF NOT EXISTS datasets_file ON datasets (file_id);
+"""
+
+
+def _attr_row(value):
+    """Returns: Tuple (text, min, max) of an attribute value.
+
+    Numeric values are stored with their min and max value, everything else
+    only as text.
+
+    """
+
+    if isinstance(value, bytes):
+        return value.decode(errors='replace'), None, None
+    elif isinstance(value, str):
+        return value, None, None
+
+    array = np.asarray(value)
+
+    if array.dtype.kind in 'biuf' and array.size:
+        array = array.astype(np.float64)
+        finite = array[np.isfinite(array)]
+
+        if array.size == 1:
+            text = repr(array.item())
+        else:
+            text = str(array.tolist())
+
+        if finite.size:
+            return text, float(finite.min()), float(finite.max())
+        else:
+            return text, None, None
+    elif array.dtype.kind in 'SO' and array.size == 1:
+        return _attr_row(array.item())
+    else:
+        return str(value), None, None
+
+
+class Catalog(object):
+    """SQLite index of the hdf attributes in a directory tree.
+
+    Example:
+        catalog = Catalog('catalog.sqlite')
+        catalog.scan('data/**/*.hdf5')
+        catalog.query({'temperature': (0.29, 0.31), 'gate_unit': 'V'})
+
+    """
+
+    def __init__(self, database, attrs=None):
+        """Open or create the catalog database.
+
+        Keyword arguments:
+        attrs -- list of attribute names to index, None for all.
+
+        """
+
+        self._database = database
+        self._attrs = None if attrs is None else set(attrs)
+
+        self._connection = sqlite3.connect(database)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __len__(self):
+        """x.__len__() <==> len(x)
+
+        Return the number of indexed files.
+
+        """
+        return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    @property
+    def database(self):
+        return self._database
+
+    def close(self):
+        self._connection.close()
+
+    def files(self):
+        """Returns: Sorted list of all indexed filenames.
+
+        """
+
+        rows = self._connection.execute('SELECT filename FROM files ORDER BY filename')
+        return [filename for filename, in rows]
+
+    def scan(self, file_pattern='**/*.hdf5', recursive=True):
+        """Index all new and changed files matching the pattern.
+
+        Files get only opened if their mtime or size changed since the last
+        scan. Indexed files that do not exist anymore get removed.
+
+        Returns: Tuple (indexed, unchanged, removed) numbers of files.
+        """
+
+        known = dict()
+        for file_id, filename, mtime, size in self._connection.execute(
+                'SELECT id, filename, mtime, size FROM files'):
+            known[filename] = (file_id, mtime, size)
+
+        indexed = unchanged = removed = 0
+
+        for filename in ftools.flist(file_pattern, recursive=recursive):
+            filename = os.path.abspath(filename)
+            stat = os.stat(filename)
+
+            entry = known.get(filename)
+            if entry is not None and entry[1:] == (stat.st_mtime, stat.st_size):
+                unchanged += 1
+                continue
+
+            try:
+                items = self._read(filename)
+            except OSError:
+                # Not a hdf file or still opened for writing
+                continue
+
+            with self._connection:
+                if entry is not None:
+                    self._connection.execute('DELETE FROM files WHERE id = ?', (entry[0],))
+                self._insert(filename, stat, items)
+
+            indexed += 1
+
+        with self._connection:
+            for filename, (file_id, *_) in known.items():
+                if not os.path.exists(filename):
+                    self._connection.execute('DELETE FROM files WHERE id = ?', (file_id,))
+                    removed += 1
+
+        return indexed, unchanged, removed
+
+    def _read(self, filename):
+        """Returns: List of (path, type, shape, dtype, attrs) of all items.
+
+        """
+
+        items = []
+
+        def visit(path, item):
+            if path.split('/')[0] == hdf.HdfIndex.name:
+                return
+
+            if self._attrs is None:
+                names = [name for name in item.attrs if name != hdf.Dataset.counter]
+            else:
+                names = [name for name in item.attrs if name in self._attrs]
+
+            attrs = []
+            for name in names:
+                try:
+                    attrs.append((name,) + _attr_row(item.attrs[name]))
+                except (OSError, TypeError):
+                    # Unsupported attribute types
+                    pass
+
+            if hasattr(item, 'shape'):
+                items.append(('/' + path, 'dataset', str(item.shape), str(item.dtype), attrs))
+            else:
+                items.append(('/' + path, 'group', '', '', attrs))
+
+        with hdf.File(filename, 'r', index=False) as f:
+            f.visititems(visit)
+
+        return items
+
+    def _insert(self, filename, stat, items):
+        cursor = self._connection.execute(
+            'INSERT INTO files (filename, mtime, size) VALUES (?, ?, ?)',
+            (filename, stat.st_mtime, stat.st_size))
+        file_id = cursor.lastrowid
+
+        for path, itype, shape, dtype, attrs in items:
+            cursor = self._connection.execute(
+                'INSERT INTO datasets (file_id, path, type, shape, dtype) VALUES (?, ?, ?, ?, ?)',
+                (file_id, path, itype, shape, dtype))
+            dataset_id = cursor.lastrowid
+
+            self._connection.executemany(
+                'INSERT INTO attrs (dataset_id, name, text, min, max) VALUES (?, ?, ?, ?, ?)',
+                [(dataset_id,) + attr for attr in attrs])
+
+    def query(self, conditions, type=None):
+        """Find all groups and datasets matching every condition.
+
+        The conditions are a dictionary of attribute names and values:
+            'text' -- attribute equals the string.
+            number -- numeric attribute equals the number.
+            (low, high) -- any value of a numeric attribute lies in the
+                           range, low or high can be None. For array
+                           attributes the range of min and max is compared.
+
+        Keyword arguments:
+        type -- 'group' or 'dataset' to restrict the results.
+
+        Returns: Sorted list of (filename, path).
+        """
+
+        sql = ['SELECT files.filename, datasets.path FROM datasets '
+               'JOIN files ON files.id = datasets.file_id WHERE 1']
+        params = []
+
+        if type is not None:
+            sql.append('AND datasets.type = ?')
+            params.append(type)
+
+        try:
+            conditions = conditions.items()
+        except AttributeError:
+            pass
+
+        for name, value in conditions:
+            sql.append('AND datasets.id IN (SELECT dataset_id FROM attrs WHERE name = ?')
+            params.append(name)
+
+            if isinstance(value, str):
+                sql.append('AND text = ?)')
+                params.append(value)
+            elif isinstance(value, (tuple, list)):
+                low, high = value
+                if low is not None:
+                    sql.append('AND max >= ?')
+                    params.append(float(low))
+                if high is not None:
+                    sql.append('AND min <= ?')
+                    params.append(float(high))
+                sql.append(')')
+            else:
+                sql.append('AND min = ? AND max = ?)')
+                params += [float(value), float(value)]
+
+        sql.append('ORDER BY files.filename, datasets.path')
+
+        return list(self._connection.execute(' '.join(sql), params))
+
+    def attrs(self, filename, path):
+        """Returns: Dictionary of the indexed attribute texts of path.
+
+        """
+
+        rows = self._connection.execute(
+            'SELECT attrs.name, attrs.text FROM attrs '
+            'JOIN datasets ON datasets.id = attrs.dataset_id '
+            'JOIN files ON files.id = datasets.file_id '
+            'WHERE files.filename = ? AND datasets.path = ?',
+            (os.path.abspath(filename), path))
+        return dict(rows)
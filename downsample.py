@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.downsample
+    --------------------
+
+    The module is part of the pymeasure package. It reduces 1d traces with
+    more points than screen pixels to a min/max envelope per pixel column.
+    The envelope looks the same on screen as the full trace but is much
+    cheaper to render.
+
+"""
+
+import numpy as np
+
+
+def _monotonic(x):
+    """Return 1 for increasing, -1 for decreasing and 0 for unsorted x.
+
+    """
+
+    diff = np.diff(x)
+    if np.all(diff >= 0):
+        return 1
+    elif np.all(diff <= 0):
+        return -1
+    else:
+        return 0
+
+
+def minmax(x, y, xlim, pixels, log=False):
+    """Reduce the trace to the min and max value per pixel column.
+
+    The x range xlim (None for the full data range) gets divided into pixels
+    columns. Every column with data is represented by its first and last x
+    value and the min and max y value. Points outside of xlim collapse to
+    their min/max envelope and the neighbouring point, so lines still enter
+    the view correctly and the data limits stay unchanged. Traces with
+    unsorted x are returned as they are.
+
+    Returns: Tuple (x, y) of numpy arrays.
+    """
+
+    x = np.asarray(x)
+    y = np.asarray(y)
+    pixels = int(pixels)
+
+    # Nothing to gain for short traces
+    if pixels < 1 or x.size <= 4 * pixels:
+        return x, y
+
+    direction = _monotonic(x)
+    if direction == 0:
+        return x, y
+    elif direction < 0:
+        x = x[::-1]
+        y = y[::-1]
+
+    if xlim is None:
+        xlim = (x[0], x[-1])
+
+    lower, upper = sorted(xlim)
+    start = np.searchsorted(x, lower, 'left')
+    stop = np.searchsorted(x, upper, 'right')
+
+    xparts = []
+    yparts = []
+
+    # Envelope and neighbour of the points left of the view
+    if start > 0:
+        xparts.append([x[0], x[0], x[start - 1]])
+        yparts.append([np.nanmin(y[:start]), np.nanmax(y[:start]), y[start - 1]])
+
+    # Min/max per pixel column inside the view
+    if stop > start:
+        xview = x[start:stop]
+        yview = y[start:stop]
+
+        if log and lower > 0:
+            edges = np.geomspace(lower, upper, pixels + 1)
+        else:
+            edges = np.linspace(lower, upper, pixels + 1)
+
+        # Start index of every column that contains points
+        starts = np.unique(np.searchsorted(xview, edges[:-1], 'left'))
+        starts = starts[starts < xview.size]
+        ends = np.append(starts[1:], xview.size)
+
+        ymin = np.fmin.reduceat(yview, starts)
+        ymax = np.fmax.reduceat(yview, starts)
+
+        # Keep the rising or falling direction of every column
+        falling = yview[starts] > yview[ends - 1]
+        yfirst = np.where(falling, ymax, ymin)
+        ylast = np.where(falling, ymin, ymax)
+
+        xparts.append(np.column_stack((xview[starts], xview[ends - 1])).ravel())
+        yparts.append(np.column_stack((yfirst, ylast)).ravel())
+
+    # Neighbour and envelope of the points right of the view
+    if stop < x.size:
+        xparts.append([x[stop], x[-1], x[-1]])
+        yparts.append([y[stop], np.nanmin(y[stop:]), np.nanmax(y[stop:])])
+
+    x = np.concatenate(xparts)
+    y = np.concatenate(yparts)
+
+    if direction < 0:
+        x = x[::-1]
+        y = y[::-1]
+
+    return x, y
+
+
+class MinMaxDecimator(object):
+    """Cache for the min/max reduction of one trace.
+
+    The reduction only gets recomputed if the data version, the x limits or
+    the number of pixels changed.
+
+    """
+
+    def __init__(self):
+        self._key = None
+        self._result = None
+
+    def __call__(self, x, y, xlim, pixels, version, log=False):
+        if xlim is not None:
+            xlim = tuple(xlim)
+
+        key = (version, xlim, int(pixels), bool(log))
+
+        if key != self._key:
+            self._result = minmax(x, y, xlim, pixels, log)
+            self._key = key
+
+        return self._result
+
+    def clear(self):
+        """Drop the cached reduction.
+
+        """
+        self._key = None
+        self._result = None
@@ -76,11 +76,14 @@ def findex(filename, digits=3, start=0, stop=None, step=1, position=-1, seperato
         value += step
 
 
-def flist(file_pattern, *sorted_args, **sorted_kwargs):
+def flist(file_pattern, *sorted_args, recursive=False, **sorted_kwargs):
     """List of sorted filenames in path, based on pattern.
 
+    With recursive=True the pattern '**' matches any files and zero or more
+    directories and subdirectories.
+
     """
-    files = glob.glob(file_pattern)
+    files = glob.glob(file_pattern, recursive=recursive)
     return sorted(files, *sorted_args, **sorted_kwargs)
 
 
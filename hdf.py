@@ -5,12 +5,19 @@ import numpy as np
 import datetime
 import PIL
 import os
+import time
+import json
+import posixpath
+from collections import deque
+from queue import Queue, Full
+from threading import Condition, Event, Thread
 
 
 class HdfProxy(object):
 
     def __init__(self):
         self.__dict__['_hdf'] = None
+        self.__dict__['_root'] = None
 
     def __getattr__(self, name):
         return getattr(self._hdf, name)
@@ -27,6 +34,15 @@ class HdfProxy(object):
     def __len__(self):
         return len(self._hdf)
 
+    def _file_index(self):
+        """Returns: HdfIndex of the file or None.
+
+        """
+
+        if self._root is None:
+            return None
+        return self._root._index
+
     def add_attrs(self, pairs, prefix='', suffix='', none_type=False):
         """Adding a list of tuples or a dictonary type to the attributes.
 
@@ -53,28 +69,72 @@ class HdfProxy(object):
             except TypeError:
                 self._hdf.attrs['{}{}{}'.format(prefix, key, suffix)] = str(value)
 
+        index = self._file_index()
+        if index is not None:
+            index.add(self._hdf)
+
 
 class HdfInterface(HdfProxy):
 
     def __getitem__(self, name):
+        index = self._file_index()
+
+        # Use the index only once it got built, a single item access must
+        # not traverse the whole file
+        if index is not None and index.built and isinstance(name, str):
+            path = posixpath.normpath(posixpath.join(self._hdf.name, name))
+            item = index.wrapper(path)
+            if item is not None:
+                return item
+
         item = self._hdf[name]
 
         if isinstance(item, h5py.Group):
-            return Group(item)
+            return Group(item, self._root)
         elif isinstance(item, h5py.Dataset):
             try:
                 if item.attrs['CLASS'] == b'IMAGE':
                     return PIL.Image.fromarray(item[:])
                 else:
-                    return Dataset(item)
+                    return Dataset(item, self._root)
             except KeyError:
-                return Dataset(item)
+                return Dataset(item, self._root)
         else:
             return item
 
+    def __setitem__(self, name, value):
+        self._hdf[name] = value
+
+        index = self._file_index()
+        if index is not None:
+            try:
+                index.add(self._hdf[name])
+            except KeyError:
+                # Dangling links
+                pass
+
     def __delitem__(self, name):
+        path = self._hdf[name].name
         del self._hdf[name]
 
+        index = self._file_index()
+        if index is not None:
+            index.remove(path)
+
+    def create_group(self, name, *args, **kwargs):
+        """Create a new group.
+
+        Returns: Group
+        """
+
+        group = self._hdf.create_group(name, *args, **kwargs)
+
+        index = self._file_index()
+        if index is not None:
+            index.add(group)
+
+        return Group(group, self._root)
+
     def tree(self):
         """Detailed view of hdf group content.
 
@@ -86,7 +146,18 @@ class HdfInterface(HdfProxy):
                 self.items = []
 
             def add_item(self, path, item):
-                self.items.append((path, item))
+                if path.split('/')[0] == HdfIndex.name:
+                    pass
+                elif isinstance(item, h5py.Group):
+                    self.items.append((path, 'group', ''))
+                elif isinstance(item, h5py.Dataset):
+                    try:
+                        if item.attrs['CLASS'] == b'IMAGE':
+                            self.items.append((path, 'image', item.shape))
+                        else:
+                            self.items.append((path, 'dataset', item.shape))
+                    except KeyError:
+                        self.items.append((path, 'dataset', item.shape))
 
             def show(self):
                 '''Show the different datatypes and shapes to the related keys
@@ -100,34 +171,94 @@ class HdfInterface(HdfProxy):
                 max_path_len = len(max(self.items, default=[''], key=path_len)[0])
 
                 # Print everything pretty
-                for path, item in self.items:
-                    if isinstance(item, h5py.Group):
-                        itype = 'group'
-                        shape = ''
-                    elif isinstance(item, h5py.Dataset):
-                        try:
-                            if item.attrs['CLASS'] == b'IMAGE':
-                                itype = 'image'
-                                shape = item.shape
-                            else:
-                                itype = 'dataset'
-                                shape = item.shape
-                        except KeyError:
-                            itype = 'dataset'
-                            shape = item.shape
-
+                for path, itype, shape in self.items:
                     seperator0 = (max_path_len - len(path)) * ' '
                     seperator1 = (len('dataset') - len(itype)) * ' '
 
                     print(path, seperator0, itype, seperator1, shape)
 
         tree = Tree()
-        self.visititems(tree.add_item)
+
+        index = self._file_index()
+        if index is None:
+            self.visititems(tree.add_item)
+        else:
+            # Take the cached entries instead of visiting the file
+            for path, entry in index.children(self._hdf.name):
+                if entry['type'] == 'group':
+                    shape = ''
+                else:
+                    shape = tuple(entry['shape'])
+                tree.items.append((path, entry['type'], shape))
+
         tree.show()
 
 
     def create_dataset(self, key, override=False, date=True,
-                       dtype=np.float64, fillvalue=np.nan, **kwargs):
+                       dtype=np.float64, fillvalue=np.nan, preset=None,
+                       growable=False, looper=None, trace=None, **kwargs):
+        """Create a new dataset.
+
+        Keyword arguments:
+        preset -- None for plain h5py datasets, 'chunked' for chunked
+                  datasets, 'lzf' or 'gzip' (shuffle and gzip level 1) for
+                  chunked, compressed datasets.
+        growable -- the first axis is unlimited and grows with add_data.
+        looper -- take the shape from the looper. Sweeps of unknown length
+                  like SweepForEver are only allowed as outer sweep and make
+                  the dataset growable.
+        trace -- expected trace length, added as last dimension to the
+                 looper shape.
+
+        If the chunk shape is not given, it is choosen from the shape, so
+        that every chunk holds whole traces.
+
+        """
+
+        if looper is not None and 'shape' not in kwargs:
+            shape = _looper_shape(looper)
+            if trace is not None:
+                shape += (int(trace),)
+            kwargs['shape'] = shape
+
+        if 'shape' in kwargs:
+            try:
+                shape = tuple(kwargs['shape'])
+            except TypeError:
+                shape = (kwargs['shape'],)
+        elif 'data' in kwargs:
+            shape = np.shape(kwargs['data'])
+        else:
+            shape = None
+
+        if shape is not None and None in shape:
+            if None in shape[1:]:
+                raise ValueError('only the outer sweep can have unknown points.')
+            growable = True
+            shape = (0,) + shape[1:]
+            kwargs['shape'] = shape
+
+        if preset not in [None, 'chunked', 'lzf', 'gzip']:
+            raise ValueError('preset must be None, chunked, lzf or gzip.')
+
+        if (growable or preset is not None) and not shape:
+            raise ValueError('presets need a shape with at least one dimension.')
+
+        if growable:
+            kwargs.setdefault('maxshape', (None,) + shape[1:])
+
+            if preset is None:
+                preset = 'chunked'
+
+        if preset is not None:
+            kwargs.setdefault('chunks', _chunk_shape(shape, np.dtype(dtype).itemsize, growable))
+
+        if preset == 'lzf':
+            kwargs.setdefault('compression', 'lzf')
+        elif preset == 'gzip':
+            kwargs.setdefault('shuffle', True)
+            kwargs.setdefault('compression', 'gzip')
+            kwargs.setdefault('compression_opts', 1)
 
         if override:
             try:
@@ -135,6 +266,9 @@ class HdfInterface(HdfProxy):
             except KeyError:
                 pass
 
+        if self._hdf.file.swmr_mode:
+            raise ValueError('no new datasets in swmr mode.')
+
         dataset = self._hdf.create_dataset(key, dtype=dtype, fillvalue=fillvalue, **kwargs)
 
         if date is True:
@@ -149,7 +283,11 @@ class HdfInterface(HdfProxy):
         else:
             raise TypeError('date must be True, False or a custom datestring')
 
-        return Dataset(dataset)
+        index = self._file_index()
+        if index is not None:
+            index.add(dataset)
+
+        return Dataset(dataset, self._root)
 
     def create_composed_dataset(self, key, override, fieldnames, fieldtype=np.float64,
                                 fillvalue=np.nan, **kwargs):
@@ -197,6 +335,10 @@ class HdfInterface(HdfProxy):
             dset.attrs['IMAGE_VERSION'] = np.string_('1.2')
             dset.attrs['IMAGE_SUBCLASS'] = np.string_('IMAGE_TRUECOLOR')
 
+            index = self._file_index()
+            if index is not None:
+                index.add(dset._hdf)
+
     def add_txt(self, key, filename, override=False, unicode=True):
         """Load txt file into hdf dataset.
 
@@ -217,7 +359,29 @@ class HdfInterface(HdfProxy):
 
 class File(HdfInterface):
 
-    def __init__(self, filename, *file_args, override=False, **file_kwargs):
+    def __init__(self, filename, *file_args, override=False, buffered=False,
+                 max_memory=2**26, flush_interval=1., swmr=False, index=True,
+                 sidecar=False, index_attrs=('date',), mmap=False, **file_kwargs):
+        """Open or create the hdf file.
+
+        With buffered=True Dataset.add_data only queues the data and a
+        BufferedWriter thread writes it in the background. It buffers at most
+        max_memory bytes and flushes the file every flush_interval seconds.
+
+        With swmr=True the file uses the latest file format, which allows
+        single writer multiple reader access. A writer creates all datasets
+        and calls start_swmr() afterwards, files opened in mode 'r' get read
+        in swmr mode directly.
+
+        With index=True the type, shape, dtype and the index_attrs of all
+        groups and datasets get cached in a HdfIndex on first use, which
+        speeds up tree() and item access. With sidecar=True the index gets
+        stored in the file on close and loaded when the file is reopened.
+
+        With mmap=True (mode 'r' only) contiguous datasets get read through a
+        read only numpy memmap instead of copying the data with h5py.
+
+        """
 
         # Create directories if it does not exit
         directory = os.path.dirname(filename)
@@ -230,7 +394,37 @@ class File(HdfInterface):
             if os.path.exists(filename):
                 os.remove(filename)
 
+        mode = file_args[0] if file_args else file_kwargs.get('mode', 'r')
+
+        if mmap and (mode != 'r' or swmr):
+            raise ValueError('mmap needs mode r without swmr.')
+
+        if swmr:
+            file_kwargs.setdefault('libver', 'latest')
+
+            if mode == 'r':
+                file_kwargs['swmr'] = True
+
         self.__dict__['_hdf'] = h5py.File(filename, *file_args, **file_kwargs)
+        self.__dict__['_root'] = self
+        self.__dict__['_mmap'] = bool(mmap)
+
+        # Count the written points of add_data for DatasetTail
+        self.__dict__['_swmr'] = bool(swmr)
+
+        if buffered:
+            self.__dict__['_writer'] = BufferedWriter(self._hdf, max_memory, flush_interval)
+        else:
+            self.__dict__['_writer'] = None
+
+        if index:
+            self.__dict__['_index'] = HdfIndex(self, index_attrs, sidecar)
+        else:
+            self.__dict__['_index'] = None
+
+        # Writes without updating the sidecar would make it outdated
+        if not (index and sidecar) and self._hdf.mode == 'r+' and HdfIndex.name in self._hdf:
+            del self._hdf[HdfIndex.name]
 
     def __repr__(self):
         return str(list(self._hdf))
@@ -239,19 +433,93 @@ class File(HdfInterface):
         return self
 
     def __exit__(self, *args, **kwargs):
-        return self._hdf.__exit__(*args, **kwargs)
+        self.close()
+
+    @property
+    def swmr_mode(self):
+        """True if the file is in single writer multiple reader mode.
+
+        """
+        return self._hdf.swmr_mode
+
+    def start_swmr(self):
+        """Switch the writing file into single writer multiple reader mode.
+
+        Readers see the data written with add_data after every flush. No
+        datasets or attributes can be created afterwards.
+
+        """
+
+        if self._writer is not None:
+            self._writer.flush()
+
+        # Attributes can not be created in swmr mode
+        def visit(path, item):
+            if isinstance(item, h5py.Dataset) and Dataset.counter not in item.attrs:
+                item.attrs[Dataset.counter] = np.int64(0)
+
+        self._hdf.visititems(visit)
+
+        self._hdf.swmr_mode = True
+        self.__dict__['_swmr'] = True
+
+    @property
+    def buffered(self):
+        """True if add_data gets written by a background thread.
+
+        """
+        return self._writer is not None
+
+    def flush(self):
+        """Write all buffered data and flush the file.
+
+        """
+
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            self._hdf.flush()
+
+    def close(self):
+        """Write all buffered data and close the file.
+
+        """
+
+        try:
+            if self._writer is not None:
+                self._writer.close()
+
+            if self._index is not None and self._index.sidecar:
+                self._index.save()
+        finally:
+            self._hdf.close()
+
+    def reindex(self):
+        """Rebuild the cached index, e.g. after changes with plain h5py.
+
+        """
+
+        if self._index is not None:
+            self._index.build()
 
 
 class Group(HdfInterface):
 
-    def __init__(self, group):
+    def __init__(self, group, root=None):
         self.__dict__['_hdf'] = group
+        self.__dict__['_root'] = root
 
 
 class Dataset(HdfProxy):
 
-    def __init__(self, dataset):
+    # Attribute with the number of points written by add_data
+    counter = '_pymeasure_written'
+
+    def __init__(self, dataset, root=None):
         self.__dict__['_hdf'] = dataset
+        self.__dict__['_root'] = root
+        self.__dict__['_memmap'] = None
+        self.__dict__['_layout'] = None
 
     def __repr__(self):
         return repr(self._hdf)
@@ -278,45 +546,987 @@ class Dataset(HdfProxy):
             # Pack new slice with integer values
             key = slice(start, stop, step)
 
+        if self._root is not None and self._root._mmap:
+            memmap = self.as_memmap()
+            if memmap is not self:
+                return memmap[key]
+
         return self._hdf.__getitem__(key)
 
+    def iter_chunks(self, axis=0, size=None, prefetch=2):
+        """Iterate over the dataset in blocks along axis.
+
+        The blocks are aligned to the chunk layout: size gets rounded up to a
+        multiple of the chunk extent along axis. Without size every block
+        holds about 16 MB. A background thread reads up to prefetch blocks
+        ahead, so reading and processing overlap.
+
+        Returns: Generator of numpy arrays.
+        """
+
+        dataset = self._hdf
+        shape = dataset.shape
+        axis = range(len(shape))[axis]
+
+        # Extent of one chunk along axis
+        if dataset.chunks is not None:
+            chunk = dataset.chunks[axis]
+        else:
+            chunk = 1
+
+        if size is None:
+            row = dataset.dtype.itemsize * (_strides(shape)[0] * shape[0] // max(shape[axis], 1))
+            size = max(2**24 // max(row * chunk, 1), 1) * chunk
+        else:
+            size = -(-int(size) // chunk) * chunk
+
+        selections = []
+        for start in range(0, shape[axis], size):
+            selection = [slice(None)] * len(shape)
+            selection[axis] = slice(start, min(start + size, shape[axis]))
+            selections.append(tuple(selection))
+
+        return _prefetch(dataset, selections, prefetch)
+
+    def as_memmap(self):
+        """Map the dataset read only into memory without copying it.
+
+        Only contiguous, uncompressed datasets with allocated storage in a
+        file on disk can be mapped. Everything else returns the Dataset
+        itself, which reads only the selected chunks on slicing.
+
+        Returns: numpy.memmap or Dataset
+        """
+
+        if self._memmap is not None:
+            return self._memmap
+
+        dataset = self._hdf
+
+        if (dataset.chunks is not None or dataset.file.driver not in ['sec2', 'stdio'] or
+                dataset.dtype.hasobject or not dataset.shape):
+            return self
+
+        offset = dataset.id.get_offset()
+        if offset is None:
+            return self
+
+        self.__dict__['_memmap'] = np.memmap(dataset.file.filename, mode='r', dtype=dataset.dtype,
+                                             shape=dataset.shape, offset=offset)
+        return self._memmap
+
+    @property
+    def growable(self):
+        """True if the first axis grows with add_data.
+
+        """
+        maxshape = self._hdf.maxshape
+        return bool(maxshape) and maxshape[0] is None
+
     def add_data(self, position, data, flush=True):
+        """Write the flat data into the dataset beginning at position.
+
+        The data fills the dataset in C order, e.g. the last dimension gets
+        filled first. Instead of writing row by row, the flat index range is
+        split into as few contiguous hyperslabs as possible, which get
+        written directly from the data buffer.
+
+        If the file is buffered, the data only gets queued and flush is
+        ignored. Reading the dataset shows the data after File.flush(). The
+        shape, dtype and layout of the dataset get read once on the first
+        buffered add_data, so queuing never waits for the h5py lock held by
+        the writer thread.
+
+        """
+
+        if self._root is not None and self._root._writer is not None:
+            self._put(self._root._writer, position, data)
+            return
+
+        dataset = self._hdf
 
         # Transform input data to the right dataytpe
-        data = np.array(data, copy=False, dtype=self.dtype)
+        data = np.ascontiguousarray(data, dtype=dataset.dtype).ravel()
 
-        size_dim0 = self.shape[-1]
-        start = position[-1]
-        position = list(position[:-1])
-        shape = list(self.shape[:-1])
+        # Data within one row, e.g. one trace per sweep step, is written
+        # with one slice assignment
+        shape = dataset.shape
+        start = int(position[-1])
+        if (len(position) == len(shape) and data.size <= shape[-1] - start and
+                all(int(index) < size for index, size in zip(position, shape))):
+            dataset[tuple(position[:-1]) + (slice(start, start + data.size),)] = data
 
-        # Insert the first 1d array beginning at start
-        ary1d = data[:size_dim0 - start]
-        sl = tuple(position + [slice(start, start + ary1d.size)])
-        self[sl] = ary1d
+            if self._root is not None and self._root._swmr:
+                strides = _strides(shape)
+                self._count(sum(int(index) * stride for index, stride in zip(position, strides)) +
+                            data.size)
 
-        # Iterate over data in size of the last dimension
-        for index in range(size_dim0 - start, data.size, size_dim0):
+            if flush:
+                dataset.file.flush()
+            return
 
-            # Increase the position in dataset
-            position_iter = zip(reversed(position), reversed(shape))
-            for i, (position_dim, size_dim) in enumerate(position_iter, 1):
+        strides = _strides(shape)
+        flat_start = sum(int(index) * stride for index, stride in zip(position, strides))
 
-                # Increase position: (..., 1, 5) -> (1, 1, 6)
-                if position_dim < size_dim - 1:
-                    position[-i] += 1
-                    break
-                # Postion is equal size of dimension: (...,1,9) -> (1, 2, 0)
-                else:
-                    position[-i] = 0
-            else:
-                # Make sure not to return start position (0,...,0) at the end
-                position[:] = shape
+        if flat_start + data.size > strides[0] * shape[0] and not self.growable:
+            raise ValueError('data exceeds dataset.')
 
-            # Insert the 1d array at position
-            ary1d = data[index: index + size_dim0]
-            sl = tuple(position + [slice(None, ary1d.size)])
-            self[sl] = ary1d
+        self._write(flat_start, data)
 
         if flush:
             self.file.flush()
+
+    def _put(self, writer, position, data):
+        """Queue the data in the writer without calling into h5py.
+
+        """
+
+        layout = self._layout
+        if layout is None:
+            layout = _Layout(self._hdf)
+            self.__dict__['_layout'] = layout
+
+        data = np.array(data, dtype=layout.dtype).ravel()
+
+        strides = layout.strides
+        flat_start = sum(int(index) * stride for index, stride in zip(position, strides))
+
+        if flat_start + data.size > strides[0] * layout.shape[0] and not layout.growable:
+            raise ValueError('data exceeds dataset.')
+
+        writer.put(self, layout, flat_start, data)
+
+    def _write(self, flat_start, data):
+        """Write the contiguous flat data beginning at the flat index.
+
+        """
+
+        dataset = self._hdf
+        shape = dataset.shape
+        flat_stop = flat_start + data.size
+        stride = _strides(shape)[0]
+
+        if flat_stop > stride * shape[0]:
+            if not self.growable:
+                raise ValueError('data exceeds dataset.')
+
+            # Resize the first axis to the last written row
+            dataset.resize(-(-flat_stop // stride), axis=0)
+            shape = dataset.shape
+
+            index = self._file_index()
+            if index is not None:
+                index.add(dataset)
+
+        for selection, block, offset in _hyperslabs(shape, flat_start, flat_stop, dataset.chunks):
+            offset -= flat_start
+            count = _strides(block)[0] * block[0]
+            dataset.write_direct(data[offset:offset + count].reshape(block), dest_sel=selection)
+
+        if self._root is not None and self._root._swmr:
+            self._count(flat_stop)
+
+    def _count(self, flat_stop):
+        """Raise the written points counter of DatasetTail to flat_stop.
+
+        Only files opened with swmr=True or in swmr mode keep the counter.
+
+        """
+
+        dataset = self._hdf
+        name = self.counter.encode()
+
+        # The attribute can only be created outside of swmr mode
+        if not h5py.h5a.exists(dataset.id, name):
+            if dataset.file.swmr_mode:
+                return
+            dataset.attrs[self.counter] = np.int64(0)
+
+        # Open attributes prevent start_swmr, so the id is not kept
+        counter = h5py.h5a.open(dataset.id, name)
+
+        written = np.zeros((), dtype=np.int64)
+        counter.read(written)
+
+        if written < flat_stop:
+            counter.write(np.array(flat_stop, dtype=np.int64))
+
+
+def _prefetch(dataset, selections, prefetch):
+    """Generator of the selections of dataset, read by a background thread.
+
+    """
+
+    queue = Queue(max(int(prefetch), 1))
+    stop = Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def read():
+        try:
+            for selection in selections:
+                if not put((dataset[selection], None)):
+                    return
+        except Exception as err:
+            put((None, err))
+            return
+        put((None, None))
+
+    thread = Thread(target=read, name='hdf-prefetch', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            block, err = queue.get()
+            if err is not None:
+                raise err
+            elif block is None:
+                break
+            yield block
+    finally:
+        stop.set()
+        thread.join()
+
+
+def stream_mean(blocks):
+    """Mean of all values of the block stream ignoring nan.
+
+    """
+
+    total = 0.
+    count = 0
+
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float64)
+        valid = ~np.isnan(block)
+        total += np.sum(block, where=valid)
+        count += np.count_nonzero(valid)
+
+    if not count:
+        return np.nan
+    return total / count
+
+
+def stream_minmax(blocks):
+    """Minimum and maximum of the block stream ignoring nan.
+
+    Returns: Tuple (min, max).
+    """
+
+    minimum = np.inf
+    maximum = -np.inf
+
+    for block in blocks:
+        block = np.asarray(block)
+        if block.size:
+            minimum = np.fmin(minimum, np.nanmin(block, initial=np.inf))
+            maximum = np.fmax(maximum, np.nanmax(block, initial=-np.inf))
+
+    if minimum > maximum:
+        return np.nan, np.nan
+    return minimum, maximum
+
+
+def stream_histogram(blocks, bins=10, range=None):
+    """Histogram of the block stream ignoring nan.
+
+    The bin edges must be known in advance: either bins is a sequence of
+    edges or an int with range=(min, max), e.g. from stream_minmax.
+
+    Returns: Tuple (hist, bin_edges) like numpy.histogram.
+    """
+
+    if np.ndim(bins) == 0:
+        if range is None:
+            raise ValueError('range is required for int bins.')
+        edges = np.linspace(range[0], range[1], int(bins) + 1)
+    else:
+        edges = np.asarray(bins, dtype=np.float64)
+
+    hist = np.zeros(edges.size - 1, dtype=np.int64)
+
+    for block in blocks:
+        block = np.asarray(block).ravel()
+        hist += np.histogram(block[~np.isnan(block)], edges)[0]
+
+    return hist, edges
+
+
+class SwmrReader(File):
+    """Read access to a hdf file that is still being written.
+
+    The writer has to open the file with swmr=True and call start_swmr().
+
+    """
+
+    def __init__(self, filename, **file_kwargs):
+        file_kwargs.setdefault('index', False)
+        super().__init__(filename, 'r', swmr=True, **file_kwargs)
+
+    def follow(self, key):
+        """Returns: DatasetTail of the dataset key.
+
+        """
+        return DatasetTail(self._hdf[key])
+
+
+class DatasetTail(object):
+    """Incremental reader of the data added to a dataset.
+
+    Dataset.add_data of a file opened with swmr=True fills datasets in C
+    order and counts the written points in the attribute Dataset.counter.
+    Every poll refreshes the dataset and reads the points between the end of the data returned so far and the
+    count, in blocks of at most block points. Datasets without the counter
+    were not written by add_data and get returned completely.
+
+    """
+
+    def __init__(self, dataset, block=2**16):
+        self._dataset = dataset
+        self._block = int(block)
+        self._position = 0
+
+    @property
+    def position(self):
+        """Returns: Flat index of the next new point.
+
+        """
+        return self._position
+
+    def poll(self):
+        """Read the newly added data.
+
+        Returns: Tuple (position, data) with the index of the first new point
+        and the flat numpy array of new points.
+        """
+
+        dataset = self._dataset
+        dataset.refresh()
+
+        shape = dataset.shape
+        size = _strides(shape)[0] * shape[0]
+
+        try:
+            written = min(int(dataset.attrs[Dataset.counter]), size)
+        except KeyError:
+            written = size
+
+        start = self._position
+        parts = []
+
+        for begin in range(start, written, self._block):
+            slabs = _hyperslabs(shape, begin, min(begin + self._block, written))
+            parts += [dataset[selection].ravel() for selection, *_ in slabs]
+
+        self._position = max(start, written)
+
+        if parts:
+            data = np.concatenate(parts)
+        else:
+            data = np.empty(0, dtype=dataset.dtype)
+
+        if start < size:
+            position = tuple(int(i) for i in np.unravel_index(start, shape))
+        else:
+            position = tuple(shape)
+
+        return position, data
+
+
+class HdfIndex(object):
+    """Cached metadata of all groups and datasets of a file.
+
+    Every entry holds type ('group', 'dataset' or 'image'), shape, dtype and
+    the selected attributes of one path. The index gets built by one
+    traversal of the file on first use and then kept up to date by the
+    pymeasure methods creating, changing or deleting items. Changes made
+    with plain h5py need a rebuild.
+
+    The index can be stored as json string in the sidecar dataset of the
+    file. An attribute of the sidecar holds a fingerprint of the hdf file
+    size and the number of entries. It gets only loaded if the fingerprint
+    and the top level items still match. Files opened writable without
+    sidecar drop it, other writes which keep the file size need a rebuild.
+
+    """
+
+    name = '_pymeasure_index'
+
+    def __init__(self, file, attrs=('date',), sidecar=False):
+        self._file = file
+        self._attrs = tuple(attrs)
+        self._sidecar = bool(sidecar)
+        self._entries = None
+        self._wrappers = dict()
+
+    @property
+    def sidecar(self):
+        """True if the index gets stored in the file.
+
+        """
+        return self._sidecar
+
+    @property
+    def built(self):
+        """True if the index got built or loaded.
+
+        """
+        return self._entries is not None
+
+    @property
+    def entries(self):
+        """Returns: Dictionary of all entries with the path as key.
+
+        """
+
+        if self._entries is None:
+            if not (self._sidecar and self.load()):
+                self.build()
+        return self._entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __getitem__(self, path):
+        return self.entries[path]
+
+    def _entry(self, item):
+        if isinstance(item, h5py.Group):
+            entry = {'type': 'group', 'shape': None, 'dtype': None}
+        else:
+            if item.attrs.get('CLASS') == b'IMAGE':
+                itype = 'image'
+            else:
+                itype = 'dataset'
+            entry = {'type': itype, 'shape': list(item.shape), 'dtype': str(item.dtype)}
+
+        attrs = dict()
+        for name in self._attrs:
+            if name in item.attrs:
+                attrs[name] = _json_value(item.attrs[name])
+        entry['attrs'] = attrs
+
+        return entry
+
+    def build(self):
+        """Rebuild the index by visiting all items of the file.
+
+        """
+
+        entries = dict()
+        hdf = self._file._hdf
+
+        def visit(path, item):
+            if path.split('/')[0] != self.name:
+                entries['/' + path] = self._entry(item)
+
+        hdf.visititems(visit)
+
+        self._entries = entries
+        self._wrappers.clear()
+
+    def add(self, item):
+        """Add or update the entry of the h5py item and its members.
+
+        """
+
+        if self._entries is None:
+            return
+
+        self._entries[item.name] = self._entry(item)
+        self._wrappers.pop(item.name, None)
+
+        if isinstance(item, h5py.Group):
+            def visit(path, member):
+                self._entries[posixpath.join(item.name, path)] = self._entry(member)
+
+            item.visititems(visit)
+
+    def remove(self, path):
+        """Remove the entry of path and all its members.
+
+        """
+
+        if self._entries is None:
+            return
+
+        prefix = path.rstrip('/') + '/'
+        for entries in [self._entries, self._wrappers]:
+            for key in [key for key in entries if key == path or key.startswith(prefix)]:
+                del entries[key]
+
+    def children(self, path='/'):
+        """Returns: Sorted list of (relative path, entry) below path.
+
+        """
+
+        prefix = path.rstrip('/') + '/'
+        return sorted((key[len(prefix):], entry) for key, entry in self.entries.items()
+                      if key.startswith(prefix))
+
+    def wrapper(self, path):
+        """Returns: Cached Group or Dataset of path, None if not indexed.
+
+        """
+
+        entry = self.entries.get(path)
+        if entry is None or entry['type'] == 'image':
+            return None
+
+        try:
+            return self._wrappers[path]
+        except KeyError:
+            pass
+
+        item = self._file._hdf[path]
+        if entry['type'] == 'group':
+            wrapper = Group(item, self._file)
+        else:
+            wrapper = Dataset(item, self._file)
+
+        self._wrappers[path] = wrapper
+        return wrapper
+
+    def _keys(self):
+        return sorted(key for key in self._file._hdf if key != self.name)
+
+    def load(self):
+        """Load the index from the sidecar dataset.
+
+        Returns: True if a valid index was loaded.
+        """
+
+        hdf = self._file._hdf
+
+        try:
+            dset = hdf[self.name]
+            content = json.loads(dset[0])
+            size, count = (int(value) for value in dset.attrs['fingerprint'])
+        except (KeyError, ValueError, TypeError):
+            return False
+
+        if hdf.id.get_filesize() != size or len(content.get('entries', ())) != count:
+            return False
+
+        if content.get('keys') != self._keys() or content.get('attrs') != list(self._attrs):
+            return False
+
+        self._entries = content['entries']
+        self._wrappers.clear()
+        return True
+
+    def save(self):
+        """Store the index in the sidecar dataset.
+
+        """
+
+        hdf = self._file._hdf
+
+        if self._entries is None or hdf.mode != 'r+' or hdf.swmr_mode:
+            return
+
+        content = json.dumps({'keys': self._keys(), 'attrs': list(self._attrs),
+                              'entries': self._entries})
+
+        if self.name in hdf:
+            del hdf[self.name]
+
+        dset = hdf.create_dataset(self.name, shape=(1,), dtype=h5py.special_dtype(vlen=str))
+        dset[0] = content
+        dset.attrs['fingerprint'] = np.zeros(2, dtype=np.int64)
+
+        # Modify the fingerprint in place, which keeps the file size
+        hdf.flush()
+        fingerprint = np.array([hdf.id.get_filesize(), len(self._entries)], dtype=np.int64)
+        dset.attrs.modify('fingerprint', fingerprint)
+
+
+def _json_value(value):
+    """Returns: Attribute value as json serializable python type.
+
+    """
+
+    if isinstance(value, bytes):
+        return value.decode(errors='replace')
+
+    try:
+        value = value.tolist()
+    except AttributeError:
+        pass
+
+    try:
+        json.dumps(value)
+    except TypeError:
+        value = str(value)
+
+    return value
+
+
+class _Layout(object):
+    """Shape, dtype and write target of a dataset for the BufferedWriter.
+
+    Read once from h5py. The shape of a growable dataset gets updated
+    locally by BufferedWriter.put.
+
+    """
+
+    __slots__ = ['shape', 'dtype', 'strides', 'growable', 'target']
+
+    def __init__(self, dataset):
+        self.shape = list(dataset.shape)
+        self.dtype = dataset.dtype
+        self.strides = _strides(self.shape)
+
+        maxshape = dataset.maxshape
+        self.growable = bool(maxshape) and maxshape[0] is None
+
+        # Number of points that get coalesced before writing
+        if dataset.chunks:
+            self.target = _strides(dataset.chunks)[0] * dataset.chunks[0]
+        else:
+            self.target = self.shape[-1]
+
+
+class _Block(object):
+
+    __slots__ = ['dataset', 'layout', 'start', 'stop', 'chunks', 'closed']
+
+    def __init__(self, dataset, layout, start, data):
+        self.dataset = dataset
+        self.layout = layout
+        self.start = start
+        self.stop = start + data.size
+        self.chunks = [data]
+        self.closed = False
+
+    @property
+    def ready(self):
+        return self.closed or self.stop - self.start >= self.layout.target
+
+
+class BufferedWriter(object):
+    """Write-behind buffer for Dataset.add_data of one file.
+
+    The queued data of every dataset gets coalesced into contiguous blocks.
+    The background thread writes a block as soon as it covers one chunk of
+    the dataset (one row of the last dimension for contiguous datasets) and
+    writes everything and flushes the file every flush_interval seconds.
+
+    At most max_memory bytes get buffered. If the disk can not keep up, put
+    blocks until the writer caught up. Errors of the writer thread get
+    raised by the next put, flush or close.
+
+    """
+
+    def __init__(self, hdf, max_memory=2**26, flush_interval=1.):
+        self._hdf = hdf
+        self._max_memory = int(max_memory)
+        self._flush_interval = float(flush_interval)
+
+        self._condition = Condition()
+        self._blocks = deque()
+        self._tails = dict()
+
+        # Buffered bytes including the block in progress
+        self._memory = 0
+
+        # Flush requests and the last completed request
+        self._requests = 0
+        self._flushed = 0
+
+        self._urgent = False
+        self._closed = False
+        self._error = None
+        self._last_flush = time.monotonic()
+
+        self._thread = Thread(target=self._run, name='hdf-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def memory(self):
+        """Returns: Number of buffered bytes.
+
+        """
+        return self._memory
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def put(self, dataset, layout, flat_start, data):
+        """Queue the flat data for the dataset beginning at the flat index.
+
+        The data must not be modified afterwards. The layout is the _Layout
+        of the dataset, put does not access the h5py dataset.
+
+        """
+
+        with self._condition:
+            self._check()
+
+            if self._closed:
+                raise ValueError('writer is closed.')
+
+            # Backpressure if the memory bound is reached
+            while self._memory and self._memory + data.nbytes > self._max_memory:
+                self._urgent = True
+                self._condition.notify_all()
+                self._condition.wait()
+                self._check()
+
+            block = self._tails.get(layout)
+
+            if block is not None and block.stop == flat_start:
+                block.chunks.append(data)
+                block.stop += data.size
+            else:
+                # Non contiguous data finishes the former block
+                if block is not None:
+                    block.closed = True
+                block = _Block(dataset, layout, flat_start, data)
+                self._blocks.append(block)
+                self._tails[layout] = block
+
+            self._memory += data.nbytes
+
+            # Track the growing first axis locally
+            stride = layout.strides[0]
+            if block.stop > stride * layout.shape[0]:
+                layout.shape[0] = -(-block.stop // stride)
+
+            # Wake the writer for a new timeout or a complete block
+            if len(block.chunks) == 1 or block.ready:
+                self._condition.notify_all()
+
+    def flush(self):
+        """Write all queued data and flush the file.
+
+        """
+
+        with self._condition:
+            self._check()
+            self._requests += 1
+            request = self._requests
+            self._condition.notify_all()
+
+            while self._flushed < request and self._thread.is_alive():
+                self._condition.wait()
+
+            self._check()
+
+    def close(self):
+        """Write all queued data, flush the file durably and stop the thread.
+
+        """
+
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
+
+        # Make sure the data is on disk
+        try:
+            os.fsync(self._hdf.id.get_vfd_handle())
+        except (AttributeError, TypeError, ValueError, OSError):
+            pass
+
+        self._check()
+
+    def _take(self):
+        """Wait for work and remove the blocks to write.
+
+        Returns: Tuple (blocks, request) with the number of the flush request
+        the blocks complete or None.
+        """
+
+        with self._condition:
+            while True:
+                elapsed = time.monotonic() - self._last_flush
+                flush = (self._closed or self._flushed < self._requests or self._urgent or
+                         (self._blocks and elapsed >= self._flush_interval))
+
+                if flush:
+                    blocks = list(self._blocks)
+                    self._blocks.clear()
+                    self._tails.clear()
+                    break
+
+                blocks = [block for block in self._blocks if block.ready]
+                if blocks:
+                    for block in blocks:
+                        self._blocks.remove(block)
+                        if self._tails.get(block.layout) is block:
+                            del self._tails[block.layout]
+                    break
+
+                if self._blocks:
+                    self._condition.wait(self._flush_interval - elapsed)
+                else:
+                    self._condition.wait()
+
+            self._urgent = False
+
+            return blocks, self._requests if flush else None
+
+    def _run(self):
+
+        while True:
+            blocks, request = self._take()
+
+            try:
+                if self._error is None:
+                    for block in blocks:
+                        if len(block.chunks) == 1:
+                            data = block.chunks[0]
+                        else:
+                            data = np.concatenate(block.chunks)
+                        block.dataset._write(block.start, data)
+
+                    if request is not None:
+                        self._hdf.flush()
+            except Exception as err:
+                self._error = err
+
+            with self._condition:
+                self._memory -= sum(chunk.nbytes for block in blocks for chunk in block.chunks)
+
+                if request is not None:
+                    self._last_flush = time.monotonic()
+                    self._flushed = request
+
+                self._condition.notify_all()
+
+                if self._closed and not self._blocks:
+                    return
+
+
+def _looper_shape(looper):
+    """Returns: Shape of the looper with None for unknown sweep points.
+
+    """
+
+    shape = []
+    for loop in reversed(list(looper)):
+        try:
+            shape.append(int(loop.points))
+        except TypeError:
+            shape.append(None)
+    return tuple(shape)
+
+
+def _chunk_shape(shape, itemsize, growable=False, target=2**18):
+    """Choose a chunk shape of about target bytes from the shape.
+
+    The chunk covers the inner dimensions completely as long as they fit into
+    target bytes, so every trace is stored in one chunk. The first axis of
+    growable datasets is taken as unlimited.
+
+    """
+
+    shape = list(shape)
+    if growable:
+        shape[0] = None
+
+    chunks = [1] * len(shape)
+    size = itemsize
+
+    for dim in range(len(shape) - 1, -1, -1):
+        extent = shape[dim]
+        rows = max(target // size, 1)
+
+        if extent is None:
+            chunks[dim] = rows
+            break
+        elif extent > rows:
+            # Equal chunks to avoid a mostly empty last chunk
+            chunks[dim] = -(-extent // -(-extent // rows))
+            break
+
+        chunks[dim] = max(extent, 1)
+        size *= chunks[dim]
+
+    return tuple(chunks)
+
+
+def _strides(shape):
+    """Flat size of one index step in every dimension of a C ordered array.
+
+    """
+
+    strides = [1] * len(shape)
+    for dim in range(len(shape) - 1, 0, -1):
+        strides[dim - 1] = strides[dim] * shape[dim]
+    return strides
+
+
+def _hyperslabs(shape, start, stop, chunks=None):
+    """Split the flat index range [start, stop) into contiguous hyperslabs.
+
+    The range of a C ordered array decomposes into at most 2 * ndim - 1
+    rectangular blocks: a partial leading row, full rows in the middle and a
+    partial trailing row of every dimension. The middle blocks get split at
+    the chunk boundaries, so the bulk of the data covers whole chunks.
+
+    Returns: List of (selection, block shape, flat start index).
+    """
+
+    ndim = len(shape)
+    strides = _strides(shape)
+    blocks = []
+
+    def middle(prefix, offset, dim, lower, upper):
+        # Full rows, split at the first and last chunk boundary
+        bounds = [lower, upper]
+        if chunks:
+            chunk = chunks[dim]
+            first = min(-(-lower // chunk) * chunk, upper)
+            last = max(upper // chunk * chunk, first)
+            bounds = [lower, first, last, upper]
+
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if b > a:
+                selection = prefix + (slice(a, b),) + tuple(slice(0, n) for n in shape[dim + 1:])
+                block = (1,) * dim + (b - a,) + tuple(shape[dim + 1:])
+                blocks.append((selection, block, offset + a * strides[dim]))
+
+    def decompose(prefix, offset, dim, start, stop):
+        stride = strides[dim]
+        first, rest0 = divmod(start, stride)
+        last, rest1 = divmod(stop, stride)
+
+        # Range inside one row of this dimension
+        if first == last or (first + 1 == last and rest0 and not rest1):
+            decompose(prefix + (slice(first, first + 1),), offset + first * stride,
+                      dim + 1, rest0, stop - first * stride)
+            return
+
+        # Partial leading row
+        if rest0:
+            decompose(prefix + (slice(first, first + 1),), offset + first * stride,
+                      dim + 1, rest0, stride)
+            first += 1
+
+        middle(prefix, offset, dim, first, last)
+
+        # Partial trailing row
+        if rest1:
+            decompose(prefix + (slice(last, last + 1),), offset + last * stride,
+                      dim + 1, 0, rest1)
+
+    if stop > start:
+        decompose((), 0, 0, start, stop)
+
+    return blocks
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.hdfconvert
+    --------------------
+
+    Command line tool of the pymeasure package to convert many hdf files in
+    parallel. Every file gets converted by one worker of a process pool:
+
+        compress -- copy with chunked, compressed datasets (lzf or gzip).
+        rechunk -- copy with new chunk shapes and no compression.
+        npy -- export every dataset into a .npy file.
+
+    The converted files are tracked in a small json state file, so an
+    interrupted run continues with the remaining files.
+
+    Usage: python -m pymeasure.hdfconvert compress 'data/**/*.hdf5' -o archive -j 32
+
+"""
+
+from pymeasure import ftools
+from pymeasure import hdf
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import h5py
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _copy_attrs(source, target):
+    for key, value in source.attrs.items():
+        # The written points counter only belongs to the swmr source
+        if key != hdf.Dataset.counter:
+            target.attrs[key] = value
+
+
+def _copy(source, target, preset, chunks):
+    """Copy all groups and datasets of source into target with new layout.
+
+    Returns: Number of copied bytes.
+    """
+
+    copied = 0
+
+    _copy_attrs(source, target)
+
+    # Take a list, iterating over items holds the h5py lock
+    for name, item in list(source.items()):
+        if name == hdf.HdfIndex.name:
+            continue
+
+        if isinstance(item, h5py.Group):
+            copied += _copy(item, target.create_group(name), preset, chunks)
+            continue
+
+        # Scalar and variable length datasets get copied as they are
+        if not item.shape or item.dtype.hasobject:
+            source.copy(item, target, name)
+            copied += item.id.get_storage_size()
+            continue
+
+        kwargs = dict()
+        if chunks is None:
+            kwargs['chunks'] = hdf._chunk_shape(item.shape, item.dtype.itemsize,
+                                                item.maxshape[0] is None)
+        else:
+            kwargs['chunks'] = tuple(min(c, max(s, 1)) for c, s in zip(chunks, item.shape))
+
+        if preset == 'lzf':
+            kwargs['compression'] = 'lzf'
+        elif preset == 'gzip':
+            kwargs.update(shuffle=True, compression='gzip', compression_opts=1)
+
+        dset = target.create_dataset(name, shape=item.shape, dtype=item.dtype,
+                                     maxshape=item.maxshape, fillvalue=item.fillvalue,
+                                     **kwargs)
+        _copy_attrs(item, dset)
+
+        # Copy blockwise along the first axis
+        start = 0
+        for block in hdf.Dataset(item).iter_chunks(axis=0):
+            dset[start:start + block.shape[0]] = block
+            start += block.shape[0]
+            copied += block.nbytes
+
+    return copied
+
+
+def _export(source, directory):
+    """Export every dataset of source into directory/path.npy.
+
+    Returns: Number of exported bytes.
+    """
+
+    exported = 0
+    items = []
+    source.visititems(lambda path, item: items.append((path, item)))
+
+    for path, item in items:
+        if path.split('/')[0] == hdf.HdfIndex.name or not isinstance(item, h5py.Dataset):
+            continue
+
+        # Object arrays like text datasets can not be stored without pickle
+        if item.dtype.hasobject:
+            continue
+
+        filename = os.path.join(directory, *path.split('/')) + '.npy'
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        if not item.shape:
+            np.save(filename, item[()])
+            exported += item.dtype.itemsize
+            continue
+
+        array = np.lib.format.open_memmap(filename, mode='w+', dtype=item.dtype,
+                                          shape=item.shape)
+        start = 0
+        for block in hdf.Dataset(item).iter_chunks(axis=0):
+            array[start:start + block.shape[0]] = block
+            start += block.shape[0]
+            exported += block.nbytes
+        array.flush()
+        del array
+
+    return exported
+
+
+def convert(operation, source, target, preset='gzip', chunks=None):
+    """Convert the file source into target.
+
+    The result gets written into target.part first and renamed when
+    complete, so target only exists for finished conversions.
+
+    Returns: Tuple (source, converted bytes, seconds).
+    """
+
+    start_time = time.perf_counter()
+    partial = target + '.part'
+
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+
+    with h5py.File(source, 'r') as src:
+        if operation == 'npy':
+            converted = _export(src, partial)
+        else:
+            if operation == 'rechunk':
+                preset = None
+            with h5py.File(partial, 'w') as dst:
+                converted = _copy(src, dst, preset, chunks)
+
+    # Directories of a former npy export can not be replaced
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+
+    os.replace(partial, target)
+
+    return source, converted, time.perf_counter() - start_time
+
+
+class State(object):
+    """Json file of the converted source files, their mtime and settings.
+
+    The settings are the operation, preset and chunks of the conversion. A
+    source counts as done only if it got converted with the same settings.
+
+    """
+
+    def __init__(self, filename, operation, preset=None, chunks=None):
+        self._filename = filename
+        self._settings = [operation, preset, list(chunks) if chunks else None]
+
+        try:
+            with open(filename) as fobj:
+                self._done = json.load(fobj)
+        except (OSError, ValueError):
+            self._done = dict()
+
+    def done(self, source, target):
+        """True if source was converted and did not change since.
+
+        """
+
+        entry = self._done.get(os.path.abspath(source))
+        if not isinstance(entry, dict):
+            return False
+
+        return (entry.get('mtime') == os.path.getmtime(source) and
+                entry.get('settings') == self._settings and os.path.exists(target))
+
+    def add(self, source):
+        self._done[os.path.abspath(source)] = {'mtime': os.path.getmtime(source),
+                                               'settings': self._settings}
+
+        # Write a new file and replace the old one to stay consistent
+        with open(self._filename + '.tmp', 'w') as fobj:
+            json.dump(self._done, fobj, indent=1)
+        os.replace(self._filename + '.tmp', self._filename)
+
+
+def _target(operation, source, root, output):
+    relative = os.path.relpath(os.path.abspath(source), root)
+    if operation == 'npy':
+        return os.path.join(output, ftools.fcut_extension(relative))
+    else:
+        return os.path.join(output, relative)
+
+
+def _size(nbytes):
+    for unit in ['B', 'kB', 'MB', 'GB', 'TB']:
+        if nbytes < 1000 or unit == 'TB':
+            return '{:.1f} {}'.format(nbytes, unit)
+        nbytes /= 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pymeasure.hdfconvert',
+                                     description='Convert hdf files in parallel.')
+    parser.add_argument('operation', choices=['compress', 'rechunk', 'npy'])
+    parser.add_argument('pattern', help="file pattern, '**' matches subdirectories")
+    parser.add_argument('-o', '--output', required=True, help='output directory')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--preset', choices=['lzf', 'gzip'], default='gzip',
+                        help='compression of compress')
+    parser.add_argument('--chunks', type=lambda s: tuple(int(c) for c in s.split(',')),
+                        default=None, help='chunk shape like 1,1000, default from shape')
+    parser.add_argument('--state', default=None,
+                        help='state file, default OUTPUT/.hdfconvert.json')
+    args = parser.parse_args(argv)
+
+    sources = ftools.flist(args.pattern, recursive=True)
+    if not sources:
+        print('no files match', args.pattern)
+        return 0
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(s)) for s in sources])
+    os.makedirs(args.output, exist_ok=True)
+    state = State(args.state or os.path.join(args.output, '.hdfconvert.json'),
+                  args.operation, args.preset, args.chunks)
+
+    jobs = []
+    for source in sources:
+        target = _target(args.operation, source, root, args.output)
+        if not state.done(source, target):
+            jobs.append((source, target))
+
+    print('{} files, {} done, {} to convert with {} workers'.format(
+        len(sources), len(sources) - len(jobs), len(jobs), args.jobs))
+
+    failed = 0
+    total = 0
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(convert, args.operation, source, target,
+                                   args.preset, args.chunks): source
+                   for source, target in jobs}
+
+        for nr, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+
+            try:
+                source, converted, seconds = future.result()
+            except Exception as err:
+                failed += 1
+                print('[{}/{}] {} failed: {}'.format(nr, len(jobs), source, err))
+                continue
+
+            state.add(source)
+            total += converted
+
+            elapsed = time.perf_counter() - start_time
+            eta = elapsed / nr * (len(jobs) - nr)
+
+            print('[{}/{}] {} {} {}/s | total {} {}/s eta {:.0f} s'.format(
+                nr, len(jobs), source, _size(converted), _size(converted / max(seconds, 1e-9)),
+                _size(total), _size(total / max(elapsed, 1e-9)), eta))
+            sys.stdout.flush()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -133,3 +133,18 @@ class Ad5791Dac(PyVisaInstrument):
     @property
     def identification(self):
         return self._instr.ask("*IDN?")
+
+    def _write_batch(self, pairs):
+        """Write several dac channels with one semicolon joined command.
+
+        write_many and ramp use it for every step, pairs is a list of
+        (channel, prepared value) tuples.
+
+        """
+
+        commands = []
+        for channel, value in pairs:
+            level_d = int(524287 * value / 10)
+            commands.append("CHAN {};DWORD {}".format(channel._channel, level_d))
+
+        self._instr.write(";".join(commands))
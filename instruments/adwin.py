@@ -70,9 +70,13 @@ class AdwinFFifo:
 
 class AdwinInstrument(Instrument):
 
-    def __init__(self, device_number=1, processor_type=12, reset=False, name=''):
+    def __init__(self, device_number=1, processor_type=12, reset=False, name='', io_worker=False):
         super().__init__(name, instr=ADwin.ADwin(device_number))
 
+        # Serialize all traffic of the ADwin in its own thread
+        if io_worker:
+            self._start_io_worker()
+
         if reset:
             self.reset(processor_type, reset)
 
@@ -28,9 +28,10 @@ class AdwinPro2AdcChannel(ChannelRead):
 
 class AdwinPro2ADC(AdwinInstrument):
 
-    def __init__(self, device_number=1, processor_type=12, name='', defaults=False, reset=False):
+    def __init__(self, device_number=1, processor_type=12, name='', defaults=False, reset=False,
+                 io_worker=False):
 
-        super().__init__(device_number, processor_type, reset, name)
+        super().__init__(device_number, processor_type, reset, name, io_worker)
 
         # ADC Channels
         self.__setitem__('adc1', AdwinPro2AdcChannel(1, instr=self._instr))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*
 
 from pymeasure.case import ChannelStep
+from collections import OrderedDict
 from pymeasure.instruments.adwin import AdwinInstrument
 import os
 
@@ -27,9 +28,10 @@ class AdwinPro2DacChannel(ChannelStep):
 
 class AdwinPro2Dac(AdwinInstrument):
 
-    def __init__(self, device_number=1, processor_type=12, name='', defaults=False, reset=False):
+    def __init__(self, device_number=1, processor_type=12, name='', defaults=False, reset=False,
+                 io_worker=False):
 
-        super().__init__(device_number, processor_type, reset, name)
+        super().__init__(device_number, processor_type, reset, name, io_worker)
 
         # ADC Channels
         self.__setitem__('adc1', AdwinPro2DacChannel(1, instr=self._instr))
@@ -54,5 +56,43 @@ class AdwinPro2Dac(AdwinInstrument):
             channel.steptime = 0.002
             channel.steprate = 0.5
 
+    def _write_batch(self, pairs):
+        """Write several dac channels with one SetData_Float call.
 
+        write_many and ramp use it for every step, pairs is a list of
+        (channel, prepared value) tuples.
 
+        """
+
+        # One array from the lowest to the highest dac, gaps keep their value
+        levels = dict((channel._dac_nr, value) for channel, value in pairs)
+        start = min(levels)
+        count = max(levels) - start + 1
+        if len(levels) < count:
+            data = list(self._instr.GetData_Float(2, start, count))
+        else:
+            data = [0.] * count
+
+        for dac_nr, level in levels.items():
+            data[dac_nr - start] = level
+
+        self._instr.SetData_Float(data, 2, start, count)
+
+    def read_many(self, keys=None):
+        """Read several dac channels with one GetData_Float call.
+
+        """
+
+        if keys is None:
+            keys = list(self.keys())
+
+        channels = [(key, self[key]) for key in keys]
+        if not channels:
+            return OrderedDict()
+
+        start = min(channel._dac_nr for key, channel in channels)
+        count = max(channel._dac_nr for key, channel in channels) - start + 1
+        data = self._instr.GetData_Float(2, start, count)[:]
+
+        return OrderedDict((key, channel._finish_read([data[channel._dac_nr - start]]))
+                           for key, channel in channels)
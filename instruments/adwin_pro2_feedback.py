@@ -191,9 +191,10 @@ class AdwinPro2DaqChannel(ChannelRead):
 
 class AdwinPro2Feedback(AdwinInstrument):
 
-    def __init__(self, device_number=1, processor_type=12, name='', defaults=True, reset=False):
+    def __init__(self, device_number=1, processor_type=12, name='', defaults=True, reset=False,
+                 io_worker=False):
 
-        super().__init__(device_number, processor_type)
+        super().__init__(device_number, processor_type, io_worker=io_worker)
 
         # ADC Channels
         self.__setitem__('adc1', AdwinPro2AdcChannel(1, instr=self._instr))
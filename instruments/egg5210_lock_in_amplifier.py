@@ -405,7 +405,7 @@ class _Egg5210LockInAmplifierRearPanelSubsystem(object):
 class Egg5210LockInAmplifier(PyVisaInstrument):
 
     def __init__(self, rm, address, name='', defaults=False, reset=False):
-        PyVisaInstrument.__init__(self, rm, address, name)
+        PyVisaInstrument.__init__(self, address, name, rm)
 
         # Setting the termination characters
         term_chars = self._instrument.CR
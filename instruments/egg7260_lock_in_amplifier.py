@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*
 
 from pymeasure.instruments.pyvisa_instrument import PyVisaInstrument
-from pymeasure.case import ChannelRead, ChannelStep
+from pymeasure.case import ChannelRead, ChannelStep, CachedProperty
 import time
 from collections import OrderedDict
 
@@ -13,7 +13,7 @@ class _Egg7260LockInAmplifierChannel(ChannelRead):
         self._instrument = instrument
         self._channel = channel
         self._unit = 'volt'
-        self._config += ['time_constant']
+        self._config += ['time_constant', 'sensitivity']
 
     _tcs = OrderedDict([(1.0E-05, 0), (2.0E-05, 1), (4.0E-5, 2), (8.0E-5, 3),
                (16.0E-5, 4), (32.0E-5, 5), (64.0E-5, 6), (5.0E-3, 7),
@@ -23,6 +23,13 @@ class _Egg7260LockInAmplifierChannel(ChannelRead):
                (500.0, 22), (1.0E3, 23), (2.0E3, 24), (5.0E3, 25),
                (10.0E3, 26), (20.0E3, 27), (50.0E3, 28), (1.0E5, 29)])
 
+    _sens = OrderedDict([(2.0E-9, 1), (5.0E-9, 2), (10.0E-9, 3), (20.0E-9, 4),
+               (50.0E-9, 5), (100.0E-9, 6), (200.0E-9, 7), (500.0E-9, 8),
+               (1.0E-6, 9), (2.0E-6, 10), (5.0E-6, 11), (10.0E-6, 12),
+               (20.0E-6, 13), (50.0E-6, 14), (100.0E-6, 15), (200.0E-6, 16),
+               (500.0E-6, 17), (1.0E-3, 18), (2.0E-3, 19), (5.0E-3, 20),
+               (10.0E-3, 21), (20.0E-3, 22), (50.0E-3, 23), (0.1, 24),
+               (0.2, 25), (0.5, 26), (1.0, 27)])
 
     @ChannelRead._readmethod
     def read(self):
@@ -36,7 +43,7 @@ class _Egg7260LockInAmplifierChannel(ChannelRead):
             value = float(value.strip('\x00'))
         return [value]
 
-    @property
+    @CachedProperty
     def time_constant(self):
         '''Returns the time constant used for measurements (integration time).
 
@@ -60,6 +67,35 @@ class _Egg7260LockInAmplifierChannel(ChannelRead):
 
         self._instrument.write('TC ' + str(nr))
 
+    @CachedProperty
+    def sensitivity(self):
+        '''Returns the full-scale sensitivity of the signal channel.
+
+        '''
+
+        value = self._instrument.query('SEN.')
+        try:
+            value = float(value)
+        except ValueError:
+            value = float(value.strip('\x00'))
+        return value
+
+    @sensitivity.setter
+    def sensitivity(self, volts):
+        '''Sets the full-scale sensitivity in voltage mode.
+        The sensitivity can be set to discrete values. If the user chooses
+        an impossible value, the sensitivity is set to the next higher
+        allowed value.
+        The sensitivity ranges from 2E-09 to 1 volt.
+
+        '''
+
+        for value, nr in list(_Egg7260LockInAmplifierChannel._sens.items()):
+            if volts <= value:
+                break
+
+        self._instrument.write('SEN ' + str(nr))
+
 class _Egg7260LockInAmplifierOscillator(ChannelStep):
 
     def __init__(self, instrument):
@@ -71,7 +107,7 @@ class _Egg7260LockInAmplifierOscillator(ChannelStep):
 
     _ref_dic = OrderedDict([(0, 'INT'), (1, 'EXT LOGIC'), (2, 'EXT')])
 
-    @property
+    @CachedProperty
     def reference(self):
         '''Returns the source of the reference channel:
         'INT' for internal oscillator source
@@ -104,7 +140,7 @@ class _Egg7260LockInAmplifierOscillator(ChannelStep):
             raise ValueError(err_str)
 
 
-    @property
+    @CachedProperty
     def frequency(self):
         '''Returns the frequency of the Oscillator Output.
 
@@ -148,9 +184,12 @@ class _Egg7260LockInAmplifierOscillator(ChannelStep):
 
 class _Egg7260LockInAmplifierSignalSubsystem(object):
 
-    def __init__(self, instrument):
+    def __init__(self, instrument, owner):
         self._instrument = instrument
 
+        # Lock-in amplifier of which the input mode changes the sensitivity
+        self._owner = owner
+
     _amps_list = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
 
     @property
@@ -188,6 +227,9 @@ class _Egg7260LockInAmplifierSignalSubsystem(object):
            ' current mode\" or \"Low noise current mode\"'
            raise ValueError(err_str)
 
+        # The sensitivities depend on the input mode
+        self._owner.cache_clear()
+
     @property
     def connector(self):
         '''Returns the Signal-Connector of the device.
@@ -299,9 +341,12 @@ class _Egg7260LockInAmplifierSignalSubsystem(object):
 
 class _Egg7260LockInAmplifierAutoSubsystem(object):
 
-    def __init__(self, instrument):
+    def __init__(self, instrument, owner):
         self._instrument = instrument
 
+        # Lock-in amplifier of which the auto operations change the settings
+        self._owner = owner
+
     def sensitivity(self):
         """Performs an Auto-Sensitivity operation.
 
@@ -311,6 +356,7 @@ class _Egg7260LockInAmplifierAutoSubsystem(object):
         """
 
         self._instrument.write('AS')
+        self._owner.cache_clear()
 
 
     def measure(self):
@@ -323,6 +369,7 @@ class _Egg7260LockInAmplifierAutoSubsystem(object):
         """
 
         self._instrument.write('ASM')
+        self._owner.cache_clear()
 
     def phase(self):
         """Performs an Auto-Phase operation.
@@ -333,6 +380,7 @@ class _Egg7260LockInAmplifierAutoSubsystem(object):
         """
 
         self._instrument.write('AQN')
+        self._owner.cache_clear()
 
 class _Egg7260LockInAmplifierRearPanelSubsystem(object):
 
@@ -437,8 +485,8 @@ class Egg7260LockInAmplifier(PyVisaInstrument):
         self.__setitem__('oscillator', osc_channel)
 
         # Subsystems
-        self.auto = _Egg7260LockInAmplifierAutoSubsystem(self._instrument)
-        self.signal = _Egg7260LockInAmplifierSignalSubsystem(self._instrument)
+        self.auto = _Egg7260LockInAmplifierAutoSubsystem(self._instrument, self)
+        self.signal = _Egg7260LockInAmplifierSignalSubsystem(self._instrument, self)
         self.rear_panel = _Egg7260LockInAmplifierRearPanelSubsystem(self._instrument)
 
         if reset:
@@ -446,8 +494,37 @@ class Egg7260LockInAmplifier(PyVisaInstrument):
         elif defaults:
             self.defaults()
 
+    # Channel pairs measured together by one command
+    _pairs = [('XY.', 'x', 'y'), ('MP.', 'mag', 'phase')]
+
+    def read_many(self, keys=None):
+        """Read x and y with 'XY.' and mag and phase with 'MP.'.
+
+        All other channels are read one by one.
+
+        """
+
+        if keys is None:
+            keys = list(self.keys())
+
+        values = OrderedDict((key, None) for key in keys)
+
+        for command, key0, key1 in Egg7260LockInAmplifier._pairs:
+            if key0 in values and key1 in values:
+                response = self._instrument.query(command).strip('\x00')
+                value0, value1 = [float(value) for value in response.split(',')]
+                values[key0] = self[key0]._finish_read([value0])
+                values[key1] = self[key1]._finish_read([value1])
+
+        for key, value in values.items():
+            if value is None:
+                values[key] = self[key].read()
+
+        return values
+
     def reset(self):
         self._instrument.write('ADF')
+        self.cache_clear()
         self.defaults()
         time.sleep(2)
 
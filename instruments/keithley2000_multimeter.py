@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*
 
 from pymeasure.instruments.pyvisa_instrument import PyVisaInstrument
-from pymeasure.case import ChannelRead
+from pymeasure.case import ChannelRead, CachedProperty
 import time
 
 
@@ -133,7 +133,7 @@ class _Keithley2000MultimeterChannel(ChannelRead):
                 time.sleep(waiting_time)
 
     # --- autorange --- #
-    @property
+    @CachedProperty
     def autorange(self):
         cmd = (":SENS:{}".format(self._measf), ":RANG:AUTO?")
         return bool(int(self._instrument.query(''.join(cmd))))
@@ -148,7 +148,7 @@ class _Keithley2000MultimeterChannel(ChannelRead):
         self._instrument.write(''.join(cmd))
 
     # --- integration time --- #
-    @property
+    @CachedProperty
     def integration_time(self):
         cmd = ("SENS:{}".format(self._measf), ":NPLC?")
         npcs = float(self._instrument.query(''.join(cmd)))
@@ -203,7 +203,7 @@ class _Keithley2000MultimeterChannel(ChannelRead):
         self._instrument.write("TRIG:SOUR {}".format(source))
 
         # --- digits --- #
-    @property
+    @CachedProperty
     def digits(self):
         '''Reads/changes the number of digits per datapoint
 
@@ -667,6 +667,7 @@ class Keithley2000Multimeter(PyVisaInstrument):
     def reset(self):
         self._instrument.write("*RST")
         self._instrument.write("*CLS")
+        self.cache_clear()
 
         self.defaults()
 
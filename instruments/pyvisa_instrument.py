@@ -1,19 +1,207 @@
 # -*- coding: utf-8 -*
 
-import visa
+try:
+    import pyvisa as visa
+except ImportError:
+    import visa
+
 from pymeasure.case import Instrument
+from pymeasure.ioworker import IoWorker
+from threading import Lock
+import time
+
+
+# Process wide resource managers by visa library and lists of open sessions
+# by (resource manager, address), every session is a list
+# [resource, users, (args, kwargs), IoWorker or None]
+_resource_managers = dict()
+_sessions = dict()
+_lock = Lock()
+
+# List of (library, address, seconds, reused) of every connect
+connect_log = []
+
+
+def resource_manager(library=''):
+    """Return the shared resource manager of the visa library.
+
+    The library is the argument of visa.ResourceManager, e.g. '' for the
+    default backend or '@sim' for pyvisa-sim. Every library gets initialized
+    only once per process.
+
+    """
+
+    with _lock:
+        try:
+            return _resource_managers[library]
+        except KeyError:
+            rm = visa.ResourceManager(library)
+            _resource_managers[library] = rm
+            return rm
+
+
+def _is_open(resource):
+    try:
+        resource.session
+    except Exception:
+        return False
+    return True
+
+
+def open_resource(address, rm=None, *args, **kwargs):
+    """Open a session or reuse the open session of the address.
+
+    The resource manager rm is a resource manager, a library string or None
+    for the shared default resource manager. A session only gets reused if
+    it was opened with the same arguments (e.g. read_termination), otherwise
+    a new session gets opened. Attributes changed after opening, e.g. with
+    PyVisaInstrument.timeout or the read_termination set by a driver
+    constructor, are shared state and change the session of every driver
+    using it.
+
+    Returns: Tuple (resource, seconds, reused).
+    """
+
+    start_time = time.perf_counter()
+
+    if rm is None or isinstance(rm, str):
+        library = rm or ''
+        rm = resource_manager(library)
+    else:
+        library = str(rm.visalib)
+
+    key = (rm, address)
+    settings = (args, kwargs)
+
+    with _lock:
+        # Forget sessions closed outside of close_resource
+        sessions = []
+        closed = []
+        for entry in _sessions.get(key, []):
+            if _is_open(entry[0]):
+                sessions.append(entry)
+            else:
+                closed.append(entry)
+
+        for entry in sessions:
+            if entry[2] == settings:
+                entry[1] += 1
+                resource = entry[0]
+                reused = True
+                break
+        else:
+            resource = rm.open_resource(address, *args, **kwargs)
+            sessions.append([resource, 1, settings, None])
+            reused = False
+
+        _sessions[key] = sessions
+
+    # Stop the workers of the forgotten sessions
+    for entry in closed:
+        if entry[3] is not None:
+            entry[3].shutdown(wait=False)
+
+    seconds = time.perf_counter() - start_time
+    connect_log.append((library, address, seconds, reused))
+
+    return resource, seconds, reused
+
+
+def _entry(resource):
+    for sessions in _sessions.values():
+        for entry in sessions:
+            if entry[0] is resource:
+                return sessions, entry
+    return None, None
+
+
+def session_worker(resource):
+    """Return the IoWorker of a session of open_resource.
+
+    All drivers of the session share the worker, so their traffic stays
+    serialized.
+
+    """
+
+    with _lock:
+        sessions, entry = _entry(resource)
+        if entry is None:
+            raise ValueError('resource is not an open session.')
+
+        if entry[3] is None:
+            entry[3] = IoWorker(name=str(resource.resource_name))
+        return entry[3]
+
+
+def close_resource(resource):
+    """Release a session of open_resource and close it if it is unused.
+
+    The IoWorker of the session finishes the queued calls first.
+
+    """
+
+    worker = None
+
+    with _lock:
+        sessions, entry = _entry(resource)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            sessions.remove(entry)
+            worker = entry[3]
+
+            for key in [key for key, sessions in _sessions.items() if not sessions]:
+                del _sessions[key]
+
+    if worker is not None:
+        worker.shutdown()
+
+    resource.close()
 
 
 class PyVisaInstrument(Instrument):
 
-    def __init__(self, instrument_address, name='', resource_manager=None, *args, **kwargs):
+    def __init__(self, instrument_address, name='', resource_manager=None, *args,
+                 io_worker=False, **kwargs):
+        """Open the instrument session.
+
+        Keyword arguments:
+        resource_manager -- visa resource manager or visa library string like
+                            '@sim', None for the shared default manager.
+        io_worker -- serialize all traffic of the instrument in its own thread.
+
+        The session gets reused if the address is already opened by another
+        driver with the same resource manager and arguments. The drivers of
+        a session share its IoWorker and its attributes, see open_resource.
+        The connect time is stored in connect_time and the module list
+        connect_log.
 
-        if not resource_manager:
-            rm = visa.ResourceManager()
+        """
+
+        resource, self.connect_time, self.connect_reused = open_resource(
+            instrument_address, resource_manager, *args, **kwargs)
+
+        super().__init__(name, instr=resource)
+        self._address = instrument_address
+        self._resource = resource
+        self._closed = False
+
+        # Serialize all traffic of the instrument in its own thread
+        if io_worker:
+            self._start_io_worker()
 
-        super().__init__(name, instr=rm.open_resource(instrument_address, *args, **kwargs))
         self._instrument = self._instr
 
+    @property
+    def executor(self):
+        """IoWorker of the session, shared by all drivers using it.
+
+        """
+        if self._executor is None:
+            self._executor = session_worker(self._resource)
+        return self._executor
+
     @property
     def pyvisa(self):
         return self._pyvisa_subsystem
@@ -24,6 +212,7 @@ class PyVisaInstrument(Instrument):
 
     @timeout.setter
     def timeout(self, time):
+        # Changes the timeout of all drivers sharing the session
         self._instr.timeout = time
 
     @property
@@ -31,7 +220,15 @@ class PyVisaInstrument(Instrument):
         return self._address
 
     def close(self):
-        self._instr.close()
+
+        # Release the session only once per driver
+        if self._closed:
+            return
+        self._closed = True
+
+        # The last driver of the session stops the worker
+        self._executor = None
+        close_resource(self._resource)
 
 
 class PyVisaProxy(object):
@@ -6,10 +6,45 @@ Created on Thu Mar 19 13:40:16 2015
 """
 
 from pymeasure.instruments.pyvisa_instrument import PyVisaInstrument
-from pymeasure.case import ChannelRead, ChannelStep
+from pymeasure.case import ChannelRead, ChannelStep, CachedProperty
 import time
 import numpy as np
-from visa import VisaIOError
+
+try:
+    from pyvisa import VisaIOError
+except ImportError:
+    from visa import VisaIOError
+
+
+def read_display(instrument, display, retries=3, fallback=True):
+    """Read the data of a display with one binary DSPB? transfer.
+
+    The SR780 sends the display as block of little endian 4 byte floats
+    without header. The length gets validated against DSPN?. A failed or
+    short transfer gets retried after a device clear, after all retries the
+    data gets read bin by bin with DSPY? if fallback is True.
+
+    Returns: Numpy array of the display data.
+    """
+
+    bins = int(instrument.query('DSPN? {}'.format(display)))
+
+    for attempt in range(retries):
+        try:
+            instrument.write('DSPB? {}'.format(display))
+            data = np.frombuffer(instrument.read_bytes(4 * bins), dtype='<f4')
+            if data.size == bins:
+                return data.astype(np.float64)
+        except (VisaIOError, ValueError):
+            pass
+
+        # Discard the rest of the block
+        instrument.clear()
+
+    if not fallback:
+        raise ValueError('no valid binary data of display {} after {} attempts.'.format(display, retries))
+
+    return np.array([float(instrument.query('DSPY? {}, {}'.format(display, i))) for i in range(bins)])
 
 
 class TransferFunction(ChannelRead):
@@ -23,11 +58,7 @@ class TransferFunction(ChannelRead):
 
     @ChannelRead._readmethod
     def read(self):
-        bins = int(self._instrument.query('DSPN? 0'))
-        noise = []
-        for i in range(bins):
-            noise += [float(self._instrument.query('DSPY? 0, {}'.format(i)))]
-        return noise
+        return read_display(self._instrument, 0)
 
     @property
     def frequency(self):
@@ -37,7 +68,7 @@ class TransferFunction(ChannelRead):
         freq = np.linspace(int(start), int(end), int(bins))
         return freq
 
-    @property
+    @CachedProperty
     def resolution(self):
         bins = int(self._instrument.query('SNPS? 1'))
         return(bins)
@@ -55,7 +86,7 @@ class TransferFunction(ChannelRead):
         bins = [100, 200, 400, 800]
         self._instrument.write('SNPS2 , {}'.format(bins[number]))
 
-    @property
+    @CachedProperty
     def range(self):
         start = float(self._instrument.query('SSTR? 0'))
         end = float(self._instrument.query('SSTP? 0'))
@@ -77,7 +108,7 @@ class TransferFunction(ChannelRead):
         finished2 = int(self._instrument.query('NAVG? 1'))
         return avpoints1 == finished1 and avpoints2 == finished2
 
-    @property
+    @CachedProperty
     def averagepoints(self):
         avpoints = int(self._instrument.query('FAVN? 1'))
         return avpoints
@@ -237,12 +268,7 @@ class Spectrum(ChannelRead):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
         else:
-            bins = int(self._instrument.query('DSPN? {}'.format(self._channel)))
-            noise = []
-            for i in range(bins):
-                noise += [float(self._instrument.query('DSPY? {}, {}'.format(self._channel, i)))]
-                #noise += [self._instrument.query_binary_values('DSPB? {}, {}'.format(self._channel,i), datatype = 'f')]
-            return noise
+            return read_display(self._instrument, self._channel)
 
 
 #    @ChannelRead._readmethod
@@ -280,27 +306,9 @@ class Spectrum(ChannelRead):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
         else:
-            bins = int(self._instrument.query('DSPN? {}'.format(self._channel)))
-            self._instrument.read_termination = None
-            time.sleep(0.2)
-            while True:
-                try:
-                        noise = self._instrument.query_binary_values('DSPB? {}'.format(self._channel),  header_fmt='empty')
-                        if bins != len(noise):
-                            pass
-                        self._instrument.read_termination = self._instrument.LF
-                        break
-                except (VisaIOError, IndexError):
-                        noise = []
-                        pass
-
-
-            #self._instrument.read_termination = self._instrument.LF
-            #time.sleep(0.2)
-            #self._instrument.write('*CLS')
-            return noise
+            return read_display(self._instrument, self._channel, fallback=False)
 
-    @property
+    @CachedProperty
     def resolution(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -322,7 +330,7 @@ class Spectrum(ChannelRead):
             number = 3
         self._instrument.write('FLIN {} , {}'.format(self._channel, number))
 
-    @property
+    @CachedProperty
     def frequency_span(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -334,7 +342,7 @@ class Spectrum(ChannelRead):
     def frequency_span(self, span):
         self._instrument.write('FSPN {},{}'.format(self._channel, span))
 
-    @property
+    @CachedProperty
     def range(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -350,7 +358,7 @@ class Spectrum(ChannelRead):
         self._instrument.write('FEND {},{}'.format(self._channel, int(frange[1])))
         self._instrument.write('FSTR {},{}'.format(self._channel, int(frange[0])))
 
-    @property
+    @CachedProperty
     def averagepoints(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -385,7 +393,7 @@ class Spectrum(ChannelRead):
         else:
             self._instrument.write('ASCL {}'.format(self._channel))
 
-    @property
+    @CachedProperty
     def autoranging(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -407,7 +415,7 @@ class Spectrum(ChannelRead):
         elif self._channel == 0:
             self._instrument.write('A1RG {}'.format(boolian))
 
-    @property
+    @CachedProperty
     def auto_offset(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -452,11 +460,7 @@ class SweptSine(ChannelRead):
 
     @ChannelRead._readmethod
     def read(self):
-        bins = int(self._instrument.query('DSPN? {}'.format(self._channel)))
-        noise = []
-        for i in range(bins):
-            noise += [float(self._instrument.query('DSPY? {}, {}'.format(self._channel, i)))]
-        return noise
+        return read_display(self._instrument, self._channel)
 
     @property
     def frequency(self):
@@ -466,7 +470,7 @@ class SweptSine(ChannelRead):
         freq = np.linspace(int(start), int(end), int(bins))
         return freq
 
-    @property
+    @CachedProperty
     def range(self):
         start = float(self._instrument.query('SSTR? {}'.format(self._channel)))
         end = float(self._instrument.query('SSTP? {}'.format(self._channel)))
@@ -480,7 +484,7 @@ class SweptSine(ChannelRead):
         else:
             self._instrument.write('SSTR {},{}'.format(self._channel, int(frange[0])))
 
-    @property
+    @CachedProperty
     def resolution(self):
         bins = self._instrument.query('SNPS? {}'.format(self._channel))
         return int(bins)
@@ -497,7 +501,7 @@ class SweptSine(ChannelRead):
         else:
             self._instrument.write('ASCL {}'.format(self._channel))
 
-    @property
+    @CachedProperty
     def auto_offset(self):
         if self._channel == 2:
             raise SystemError('can only read one channel at once')
@@ -513,7 +517,7 @@ class SweptSine(ChannelRead):
 
 class SR780(PyVisaInstrument):
     def __init__(self, rm, address, name=''):
-        PyVisaInstrument.__init__(self, rm, address, name)
+        PyVisaInstrument.__init__(self, address, name, rm)
 
         self._instrument.read_termination = self._instrument.LF
         self._instrument.write_termination = self._instrument.LF
@@ -543,6 +547,7 @@ class SR780(PyVisaInstrument):
         self._instrument.write('MGRP2, 0')      #FFT measurement
         self._instrument.write('ALRM 0')
         self._instrument.write('AOVL 0')
+        self.cache_clear()
 
     def start_average(self):
         self._instrument.write('FAVG 2, 1')     #averaging is on (both displays)
@@ -559,6 +564,7 @@ class SR780(PyVisaInstrument):
         self._instrument.write('FWIN2, 1')
         self._instrument.write('IAOM 0')
         self._instrument.write('SRPT2,0')
+        self.cache_clear()
 
 
     def SweptSine(self):
@@ -570,6 +576,7 @@ class SR780(PyVisaInstrument):
         self._instrument.write('FWIN2, 2')
         self._instrument.write('FAVM2, 0')
         self._instrument.write('SSTY2, 0')
+        self.cache_clear()
 
     def FFT(self):
         self._instrument.write('MGRP2, 0')
@@ -580,6 +587,7 @@ class SR780(PyVisaInstrument):
         self._instrument.write('FWIN2, 1')  #Hanning Filter is used
         self._instrument.write('IAOM 0')    #turn off auto offset
         self._instrument.write('PSDU2, 1')  #use Power Spectral Density
+        self.cache_clear()
 
     @property
     def sourcing(self):
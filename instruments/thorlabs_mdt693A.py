@@ -40,7 +40,7 @@ class PiezoControlMDT693AChannel(ChannelWrite):
 class PiezoControlMDT693A(PyVisaInstrument):
     def __init__(self, resource_manager, address, name='', defaults=False, reset=False):
 
-        PyVisaInstrument.__init__(self, resource_manager, address, name, baud_rate=115200)
+        PyVisaInstrument.__init__(self, address, name, resource_manager, baud_rate=115200)
         self.__setitem__('X', PiezoControlMDT693AChannel(self._instrument, 'X'))
         self.__setitem__('Y', PiezoControlMDT693AChannel(self._instrument, 'Y'))
         self.__setitem__('Z', PiezoControlMDT693AChannel(self._instrument, 'Z'))
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.ioworker
+    ------------------
+
+    The module is part of the pymeasure package. It contains the IoWorker
+    class, a thread which executes all calls to one instrument in FIFO
+    order, and the ResourceProxy class, which routes all attribute access of
+    an instrument resource (pyvisa resource, ADwin object, ...) through such
+    a worker. Different instruments run in parallel while the traffic of
+    each instrument stays serialized.
+
+"""
+
+import queue
+import threading
+from functools import wraps
+from concurrent.futures import Executor, Future
+
+
+class IoWorker(Executor):
+    """Executor with one thread and an ordered queue of calls.
+
+    Calls submitted from the worker thread itself are executed at once, so a
+    channel method running in the worker can use a proxied resource without
+    dead lock.
+
+    """
+
+    def __init__(self, name=None):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+
+            # Stop the worker on shutdown
+            if item is None:
+                break
+
+            future, function, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as err:
+                future.set_exception(err)
+
+    def in_worker(self):
+        """True if called from the worker thread.
+
+        """
+        return threading.current_thread() is self._thread
+
+    def submit(self, function, *args, **kwargs):
+        """Queue function(*args, **kwargs) for execution in the worker.
+
+        Returns: concurrent.futures.Future of the result.
+        """
+
+        future = Future()
+
+        # Execute calls of the worker itself at once
+        if self.in_worker():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as err:
+                future.set_exception(err)
+            return future
+
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new calls after shutdown.')
+            self._queue.put((future, function, args, kwargs))
+
+        return future
+
+    def call(self, function, *args, **kwargs):
+        """Execute function(*args, **kwargs) in the worker and wait for it.
+
+        Returns: The result of the function.
+        """
+
+        if self.in_worker():
+            return function(*args, **kwargs)
+        else:
+            return self.submit(function, *args, **kwargs).result()
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Stop the worker after all queued calls.
+
+        """
+
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+
+            self._queue.put(None)
+
+        if wait and not self.in_worker():
+            self._thread.join()
+
+
+class ResourceProxy(object):
+    """Proxy which executes all access of a resource in an IoWorker.
+
+    Method calls, attribute reads and writes of the resource are queued in
+    the worker and the proxy waits for their result. Sequences of calls which
+    must not be interleaved by other threads are submitted as one function
+    to the worker:
+
+        proxy.worker.submit(lambda: (proxy.write('X'), proxy.read()))
+
+    """
+
+    def __init__(self, resource, worker):
+        self.__dict__['_resource'] = resource
+        self.__dict__['worker'] = worker
+
+    def __getattr__(self, name):
+        attr = self.worker.call(getattr, self._resource, name)
+
+        if not callable(attr):
+            return attr
+
+        worker = self.worker
+
+        @wraps(attr)
+        def method(*args, **kwargs):
+            return worker.call(attr, *args, **kwargs)
+
+        return method
+
+    def __setattr__(self, name, value):
+        self.worker.call(setattr, self._resource, name, value)
+
+    def __dir__(self):
+        return dir(self._resource)
+
+    def __repr__(self):
+        return '<ResourceProxy of {!r}>'.format(self._resource)
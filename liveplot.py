@@ -16,8 +16,12 @@
 
 # Pymeasure
 from pymeasure.indexdict import IndexDict
+from pymeasure.ringbuffer import RingBuffer
+from pymeasure.taskqueue import TaskQueue
+from pymeasure.downsample import MinMaxDecimator
 
 import abc
+import time
 import tkinter as Tk
 import warnings
 import numpy as np
@@ -29,26 +33,58 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.colors import Normalize, LogNorm
 from queue import Queue
 from threading import Event
-from functools import partial
 from collections import ChainMap
 from matplotlib.backend_bases import key_press_handler
 
 
 class Manager(object):
+    """Manager executes all graph tasks sequentially in the graphic thread.
 
-    def __init__(self):
-        self.tasks = Queue()
+    With coalesce=True pending add_data tasks of a dataplot get merged into
+    one data chunk and repeated matplotlib setters (set_*) only keep their
+    last value. max_tasks limits the number of tasks executed per update.
+
+    """
+
+    def __init__(self, coalesce=False, max_tasks=None):
+        self.tasks = TaskQueue(coalesce)
+        self.max_tasks = max_tasks
         self.running = False
+        self.tick_time = 0
+
+    def put(self, graph, function, args=(), kwargs=None, mode=None):
+        self.tasks.put(graph, function, args, kwargs, mode)
+
+    @property
+    def queue_depth(self):
+        """Number of pending tasks.
+
+        """
+        return len(self.tasks)
+
+    @property
+    def merged_tasks(self):
+        """Number of add_data tasks merged into a pending one.
+
+        """
+        return self.tasks.merged
+
+    @property
+    def dropped_tasks(self):
+        """Number of setter tasks replaced by a newer value.
+
+        """
+        return self.tasks.dropped
 
     def update(self):
 
+        start_time = time.perf_counter()
+
         graphs = []
 
-        # Execute all tasks
-        while not self.tasks.empty():
-            graph, task = self.tasks.get()
+        # Execute the pending tasks
+        for graph, task in self.tasks.get(self.max_tasks):
             task()
-            self.tasks.task_done()
 
             if graph not in graphs:
                 graphs.append(graph)
@@ -56,6 +92,8 @@ class Manager(object):
         for graph in graphs:
             graph._update()
 
+        self.tick_time = time.perf_counter() - start_time
+
 
 class Backend(object):
 
@@ -64,14 +102,30 @@ class Backend(object):
         self.manager = manager
         self.master = master
         self.close_events = []
+        self.draw_events = []
         self.closed = True
 
+        # Canvas and draw events connected to it
+        self._draw_connected = (None, [])
+
     @property
     def visible(self):
         return True
 
     def show(self, delay):
 
+        # Connect before the first draw of the figure, every event only
+        # once per canvas
+        canvas, connected = self._draw_connected
+        if canvas is not self.canvas:
+            connected = []
+            self._draw_connected = (self.canvas, connected)
+
+        for event in self.draw_events:
+            if event not in connected:
+                self.canvas.mpl_connect('draw_event', event)
+                connected.append(event)
+
         if not self.manager.running:
             self.run(delay)
             self.manager.running = True
@@ -174,17 +228,23 @@ class LiveGraph(IndexDict):
 
     _current_graph = None
 
-    def __init__(self, master=None, style='pymeasure', manager=None, **fig_kwargs):
+    def __init__(self, master=None, style='pymeasure', manager=None, blit=False, **fig_kwargs):
         """Initiate LivegraphBase class.
 
+        With blit=True the static parts of the figure get cached and only the
+        changed lines and images are redrawn. The full figure only gets
+        redrawn if view limits, color limits or the figure size change.
+
         """
         super().__init__()
 
-        if master is None:
-            self._manager = Manager()
-        else:
+        if master is not None:
             self._manager = master._manager
             master = master._window.root
+        elif manager is not None:
+            self._manager = manager
+        else:
+            self._manager = Manager()
 
         if style == 'pymeasure':
             mpl.style.use('ggplot')
@@ -209,6 +269,11 @@ class LiveGraph(IndexDict):
         self.shape = ()
         self.close_event = None
 
+        # Cached backgrounds of all axes for blitting
+        self._blit = bool(blit)
+        self._backgrounds = None
+        self._limits = None
+
         LiveGraph._current_graph = self
 
     def __setitem__(self, key, dataplot):
@@ -222,13 +287,34 @@ class LiveGraph(IndexDict):
         else:
             raise TypeError('item must be a Dataplot.')
 
+        # Exclude the dataplot from the cached background
+        if self._blit:
+            for artist in dataplot._artists:
+                artist.set_animated(True)
+            self._backgrounds = None
+
     def __getitem___(self, key):
 
         return super().__getitem___(key)
 
     def add_task(self, function, *args, **kwargs):
-        task = (self, partial(function, *args, **kwargs))
-        self._manager.tasks.put(task)
+
+        # Only the last value of repeated matplotlib setters is relevant
+        if getattr(function, '__name__', '').startswith('set_'):
+            mode = 'last'
+        else:
+            mode = None
+
+        self._manager.put(self, function, args, kwargs, mode)
+
+    def add_data_task(self, function, *data, replace=False):
+        """Add a task with data arrays that can be merged with pending ones.
+
+        Dataplots replacing their data with every add_data use replace=True,
+        so only the last pending data is kept instead of merging.
+
+        """
+        self._manager.put(self, function, data, mode='last' if replace else 'merge')
 
     def dataplots(self):
         """Return a list of (index, key) pairs in Graph.
@@ -255,16 +341,83 @@ class LiveGraph(IndexDict):
     def visible(self):
         return self._window.visible
 
+    @property
+    def blit(self):
+        """True if only changed lines and images get redrawn.
+
+        """
+        return self._blit
+
+    def _view_limits(self):
+        """Return everything that requires a full redraw if changed.
+
+        """
+
+        limits = [tuple(self.figure.bbox.bounds)]
+
+        for axes in self.figure.axes:
+            limits.append((tuple(axes.get_xlim()), tuple(axes.get_ylim())))
+
+        for dataplot in self.__iter__():
+            for artist in dataplot._artists:
+                if isinstance(artist, mpl.image.AxesImage):
+                    limits.append((artist.get_clim(), tuple(artist.get_extent())))
+
+        return limits
+
+    def _draw_artists(self, axes=None):
+        """Draw the animated artists of all dataplots or of one axes.
+
+        """
+        for dataplot in self.__iter__():
+            if axes is None or dataplot._axes is axes:
+                for artist in dataplot._artists:
+                    dataplot._axes.draw_artist(artist)
+
+    def _on_draw(self, event):
+        """Cache the backgrounds after every full draw of the figure.
+
+        Draws of savefig use another renderer and size and are skipped.
+
+        """
+        canvas = self._window.canvas
+        if event.canvas is not canvas or canvas.is_saving():
+            return
+
+        self._backgrounds = dict((axes, canvas.copy_from_bbox(axes.bbox))
+                                 for axes in self.figure.axes)
+        self._draw_artists()
+
     def _update(self):
 
         # Iterate through all subplots and check for updates
+        updated = []
         for subplot in self.__iter__():
             if subplot._request_update.is_set():
                 subplot._update()
                 subplot._request_update.clear()
+                updated.append(subplot)
+
+        if not self._window.visible:
+            return
+
+        if not self._blit:
+            self.figure.canvas.draw()
+            return
 
-        if self._window.visible:
+        # Redraw everything if the limits changed
+        limits = self._view_limits()
+        if self._backgrounds is None or limits != self._limits:
+            self._limits = limits
             self.figure.canvas.draw()
+            return
+
+        # Only redraw the axes with changed dataplots
+        canvas = self.figure.canvas
+        for axes in set(dataplot._axes for dataplot in updated):
+            canvas.restore_region(self._backgrounds[axes])
+            self._draw_artists(axes)
+            canvas.blit(axes.bbox)
 
     @property
     def tight_layout(self):
@@ -297,6 +450,9 @@ class LiveGraph(IndexDict):
         self._window.close()
 
     def show(self, *, delay=50):
+        if self._blit and self._on_draw not in self._window.draw_events:
+            self._window.draw_events.append(self._on_draw)
+
         self._window.show(delay)
 
 
@@ -321,6 +477,9 @@ class DataplotBase(object, metaclass=abc.ABCMeta):
         self._axes = axes
         self._request_update = Event()
 
+        # Artists that get redrawn on updates
+        self._artists = []
+
     @abc.abstractmethod
     def add_data(self):
         pass
@@ -703,7 +862,7 @@ class YaxisConf(object):
 
 class Dataplot1d(DataplotBase):
 
-    def __init__(self, axes, *plt_args, length=None, continuously=False, graph=None, **plt_kwargs):
+    def __init__(self, axes, *plt_args, length=None, continuously=False, decimate=True, graph=None, **plt_kwargs):
         """Initiate Dataplot1d class.
 
         """
@@ -711,6 +870,7 @@ class Dataplot1d(DataplotBase):
 
         # Create emtpy line instance for axes
         self._line, = self._axes.plot([], [], *plt_args, **plt_kwargs)
+        self._artists.append(self._line)
 
         # Attributes for displayed number of points
         if length is None:
@@ -720,9 +880,13 @@ class Dataplot1d(DataplotBase):
 
         self._continuously = continuously
 
-        # Create list to contain plotting data
-        self._xdata = list()
-        self._ydata = list()
+        # Preallocate the plotting data if the number of points is known
+        if self._length:
+            self._buffer = RingBuffer(self._length, rows=2)
+        else:
+            self._buffer = None
+            self._xlist = list()
+            self._ylist = list()
 
         # Dataplot1d Configs
         self.line = LineConf(self._graph, self._line)
@@ -733,6 +897,11 @@ class Dataplot1d(DataplotBase):
 
         self.switch_xy = False
 
+        # Min/max reduction of the displayed data to the axes width
+        self._decimator = MinMaxDecimator()
+        self._version = 0
+        self.decimate = decimate
+
 
     @property
     def length(self):
@@ -763,35 +932,81 @@ class Dataplot1d(DataplotBase):
     def switch_xy(self, boolean):
         self._xy_switch = bool(boolean)
 
+    @property
+    def decimate(self):
+        """Reduce the displayed data to a min/max envelope per pixel column.
+
+        The reduction only applies to monotonic x data with more points than
+        the axes has pixels and looks the same as the full data.
+
+        """
+        return self._decimate
+
+    @decimate.setter
+    def decimate(self, boolean):
+        self._decimate = bool(boolean)
+
     def add_data(self, xdata, ydata):
         """Add a list of data to the plot.
 
         """
 
-        # Put the incoming data into the data exchange queue
-        self._graph.add_task(self._add_data, xdata[:], ydata[:])
+        # Put the incoming data into the data exchange queue, without length
+        # the data replaces the displayed data
+        self._graph.add_data_task(self._add_data, xdata, ydata,
+                                  replace=self._buffer is None)
 
-    def _add_data(self, xdata, ydata):
-        if self._length:
-            self._xdata.extend(xdata)
-            self._ydata.extend(ydata)
+    def clear(self):
+        """Remove all displayed datapoints.
+
+        """
+        self._graph.add_task(self._clear)
 
-            # Clear if data is to long
-            while len(self._xdata) > self._length:
-                # Remove oldest datapoints if plotting continuously.
-                if self._continuously:
-                    del self._xdata[:-self._length]
-                    del self._ydata[:-self._length]
+    def _clear(self):
+        if self._buffer is not None:
+            self._buffer.clear()
+        else:
+            self._xlist = list()
+            self._ylist = list()
+
+        self._version += 1
+        self._request_update.set()
 
-                # Clear all displayed datapoints otherwise.
-                else:
-                    del self._xdata[:self._length]
-                    del self._ydata[:self._length]
+    @property
+    def _xdata(self):
+        if self._buffer is None:
+            return self._xlist
+        return self._buffer.view(0)
+
+    @property
+    def _ydata(self):
+        if self._buffer is None:
+            return self._ylist
+        return self._buffer.view(1)
+
+    def _add_data(self, xdata, ydata):
+        if self._buffer is not None:
+            xdata = np.asarray(xdata, dtype=np.float64).ravel()
+            ydata = np.asarray(ydata, dtype=np.float64).ravel()
+
+            # Clear all displayed datapoints if the data is to long and not
+            # plotted continuously. The ring buffer itself removes the oldest
+            # datapoints otherwise.
+            if not self._continuously:
+                points = len(self._buffer) + xdata.size
+                if points > self._length:
+                    keep = (points - 1) % self._length + 1
+                    self._buffer.clear()
+                    xdata = xdata[xdata.size - keep:]
+                    ydata = ydata[ydata.size - keep:]
+
+            self._buffer.extend(xdata, ydata)
 
         else:
-            self._xdata = xdata
-            self._ydata = ydata
+            self._xlist = xdata
+            self._ylist = ydata
 
+        self._version += 1
         self._request_update.set()
 
     def _update(self):
@@ -804,8 +1019,8 @@ class Dataplot1d(DataplotBase):
 
         """
 
-        xdata = np.array(self._xdata)
-        ydata = np.array(self._ydata)
+        xdata = np.asarray(self._xdata)
+        ydata = np.asarray(self._ydata)
 
         # Prepare displayed xdata
         if self.xaxis.log:
@@ -815,11 +1030,23 @@ class Dataplot1d(DataplotBase):
         if self.yaxis.log:
             ydata = np.abs(ydata)
 
+        if self.switch_xy:
+            xdata, ydata = ydata, xdata
+
+        # Reduce the data to the visible pixel columns
+        if self.decimate:
+            if self.xaxis.autoscale:
+                xlim = None
+            else:
+                xlim = self._axes.get_xlim()
+
+            version = (self._version, self.xaxis.log, self.yaxis.log, self.switch_xy)
+            xdata, ydata = self._decimator(xdata, ydata, xlim,
+                                           self._axes.bbox.width, version,
+                                           self.xaxis.log)
+
         # Update displayed data.
-        if not self.switch_xy:
-            self._line.set_data(xdata, ydata)
-        else:
-            self._line.set_data(ydata, xdata)
+        self._line.set_data(xdata, ydata)
 
         # Recompute the data limits.
         self._axes.relim()
@@ -949,7 +1176,7 @@ class LabelConf2d(LabelConf1d):
 
 class Dataplot2d(DataplotBase):
 
-    def __init__(self, axes, *imshow, length=None, colorbar=True, graph=None, **kw_imshow):
+    def __init__(self, axes, *imshow, length=None, rows=None, colorbar=True, graph=None, **kw_imshow):
         super().__init__(axes, graph)
 
         if length is None:
@@ -957,14 +1184,27 @@ class Dataplot2d(DataplotBase):
         else:
             self._length = length
 
+        # Take the number of rows from the outer loop of a connected looper
+        if rows is None and len(self._graph.shape) > 1:
+            rows = self._graph.shape[-2]
+
         self._exchange_queue = Queue()
         self._trace = []
-        self._data = np.array([[]])
+
+        # Preallocate the image if the number of rows is known
+        if rows:
+            self._rows = int(rows)
+            self._row = 0
+            self._data = np.full((self._rows, self._length), np.nan)
+        else:
+            self._rows = None
+            self._data = np.array([[]])
 
         # Draw an empty image
         defaults = {'cmap': 'hot', 'aspect': 'auto'}
         kw_imshow = ChainMap(kw_imshow, defaults)
         self._image = self._axes.imshow([[np.nan]], *imshow, **kw_imshow)
+        self._artists.append(self._image)
 
 
         if colorbar is True:
@@ -1005,7 +1245,7 @@ class Dataplot2d(DataplotBase):
         if isinstance(data, Dataplot1d):
             self._graph.add_task(self._add_data, data)
         else:
-            self._graph.add_task(self._add_data, data[:])
+            self._graph.add_data_task(self._add_data, data)
 
     def _add_data(self, data):
 
@@ -1020,7 +1260,15 @@ class Dataplot2d(DataplotBase):
             trace = self._trace[:self._length]
             del self._trace[:self._length]
 
-            if self._data.size:
+            if self._rows:
+                # Start a new image if all rows are filled
+                if self._row == self._rows:
+                    self._data.fill(np.nan)
+                    self._row = 0
+
+                self._data[self._row] = trace
+                self._row += 1
+            elif self._data.size:
                 self._data = np.vstack((self._data, trace))
             else:
                 self._data = np.array([trace])
@@ -1038,13 +1286,29 @@ class Dataplot2d(DataplotBase):
         self._graph.add_task(self._clear)
 
     def _clear(self):
-        self._data = np.array([[]])
+        if self._rows:
+            self._data.fill(np.nan)
+            self._row = 0
+        else:
+            self._data = np.array([[]])
         self._request_update.set()
 
+    @property
+    def rows(self):
+        """Number of preallocated image rows.
+
+        None means that the image grows with every added trace.
+
+        """
+        return self._rows
+
     def _update(self):
 
-        # Prepare displayed data
-        data = self._data.copy()
+        # Prepare displayed data. The preallocated image is displayed as view.
+        if self._rows:
+            data = self._data
+        else:
+            data = self._data.copy()
 
         # Differentiate data
         if self.diff:
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.plotserver
+    --------------------
+
+    The plotserver module is part of the pymeasure package. It runs the
+    liveplot LiveGraph and its dataplots in a separate process, so graphic
+    rendering does not compete with the measurement thread for the GIL.
+
+    The data streams are transferred through shared memory ring buffers and
+    everything else through a small control pipe. The measurement side gets
+    RemoteDataplot objects with the known add_data, clear and new_line
+    methods.
+
+"""
+
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedRingBuffer(object):
+    """Single producer, single consumer ring buffer in shared memory.
+
+    The memory starts with three int64 counters followed by the float64 data
+    of shape (rows, length): the points ever written, the points reserved by
+    a write in progress and the points dropped by the consumer. The producer
+    reserves the points, writes the data and increments the written counter
+    afterwards. The consumer keeps its own read counter and only reads what
+    the written counter allows. If the producer is more than length points
+    ahead, or overwrites points while the consumer copies them, these points
+    get dropped and counted in shared memory, so both sides see them.
+
+    """
+
+    _header = 24
+
+    def __init__(self, rows, length, name=None):
+        """Create a new buffer or attach to the existing buffer name.
+
+        """
+
+        self._rows = int(rows)
+        self._length = int(length)
+        size = self._header + 8 * self._rows * self._length
+
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._shm = _attach(name)
+            self._owner = False
+
+        buf = self._shm.buf
+        # Written, reserved and dropped points
+        self._counters = np.ndarray((3,), dtype=np.int64, buffer=buf)
+        self._data = np.ndarray((self._rows, self._length), dtype=np.float64,
+                                buffer=buf, offset=self._header)
+
+        if self._owner:
+            self._counters[:] = 0
+
+        self._read_count = int(self._counters[0])
+
+    @property
+    def name(self):
+        """Name of the shared memory block.
+
+        """
+        return self._shm.name
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def length(self):
+        return self._length
+
+    @property
+    def count(self):
+        """Number of points written since the creation of the buffer.
+
+        """
+        return int(self._counters[0])
+
+    @property
+    def dropped(self):
+        """Number of points the consumer could not read in time.
+
+        """
+        return int(self._counters[2])
+
+    def extend(self, *rows):
+        """Write the data of every row into the buffer (producer side).
+
+        """
+
+        rows = [np.asarray(row, dtype=np.float64).ravel() for row in rows]
+        points = rows[0].size
+
+        if points > self._length:
+            rows = [row[-self._length:] for row in rows]
+
+        count = int(self._counters[0])
+        write = rows[0].size
+
+        # Announce the overwritten points before writing the data
+        self._counters[1] = count + points
+
+        index = (count + points - write) % self._length
+        first = min(write, self._length - index)
+
+        for data, row in zip(self._data, rows):
+            data[index:index + first] = row[:first]
+            data[:write - first] = row[first:]
+
+        # Publish the new points after the data is written
+        self._counters[0] = count + points
+
+    def read(self, stop=None):
+        """Return the new data up to the write counter stop (consumer side).
+
+        Returns: Numpy array of shape (rows, points).
+        """
+
+        count = int(self._counters[0])
+        if stop is None or stop > count:
+            stop = count
+
+        start = self._read_count
+
+        # Skip the points that already got overwritten
+        if stop - start > self._length:
+            self._counters[2] += stop - start - self._length
+            start = stop - self._length
+
+        self._read_count = max(stop, self._read_count)
+
+        if stop <= start:
+            return np.empty((self._rows, 0))
+
+        index = np.arange(start, stop) % self._length
+        data = self._data[:, index]
+
+        # Discard the points a write overwrote during the copy
+        overwritten = min(int(self._counters[1]) - self._length - start, stop - start)
+        if overwritten > 0:
+            self._counters[2] += overwritten
+            data = data[:, overwritten:]
+
+        return data
+
+    def close(self):
+        """Release the buffer and remove it if it was created here.
+
+        """
+
+        self._counters = None
+        self._data = None
+        self._shm.close()
+
+        if self._owner:
+            self._shm.unlink()
+
+
+def _attach(name):
+    """Attach to an existing shared memory block without tracking it.
+
+    Only the creating process is allowed to unlink the block.
+
+    """
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attached block for cleanup
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _serve(conn, delay, style, shape, fig_kwargs):
+    """Main function of the plotting process.
+
+    """
+
+    import tkinter as Tk
+    import matplotlib as mpl
+    mpl.use('TkAgg')
+
+    from pymeasure.liveplot import LiveGraph, Dataplot1d, Dataplot2d
+
+    root = Tk.Tk()
+    root.withdraw()
+
+    graph = LiveGraph(style=style, **fig_kwargs)
+    graph.shape = shape
+    graph._window.close_events.append(root.quit)
+
+    dataplots = dict()
+    buffers = dict()
+
+    def transfer(key, stop=None):
+        data = buffers[key].read(stop)
+        if data.shape[1]:
+            dataplots[key].add_data(*data)
+
+    def command(cmd, *args):
+        if cmd == 'dataplot1d':
+            key, name, length, plt_args, plt_kwargs = args
+            buffers[key] = SharedRingBuffer(2, length, name)
+            dataplots[key] = Dataplot1d(*plt_args, graph=graph, **plt_kwargs)
+            graph[key] = dataplots[key]
+        elif cmd == 'dataplot2d':
+            key, name, length, plt_args, plt_kwargs = args
+            buffers[key] = SharedRingBuffer(1, length, name)
+            dataplots[key] = Dataplot2d(*plt_args, graph=graph, **plt_kwargs)
+            graph[key] = dataplots[key]
+        elif cmd in ['clear', 'new_line']:
+            # Transfer the data written before the command first
+            key, stop = args
+            transfer(key, stop)
+            getattr(dataplots[key], cmd)()
+        elif cmd == 'configure':
+            key, attributes, value = args
+            obj = dataplots[key]
+            for attribute in attributes[:-1]:
+                obj = getattr(obj, attribute)
+            setattr(obj, attributes[-1], value)
+        elif cmd == 'snapshot':
+            graph.snapshot(*args)
+        elif cmd == 'close':
+            root.quit()
+
+    def poll():
+        while conn.poll():
+            command(*conn.recv())
+
+        for key in dataplots:
+            transfer(key)
+
+        root.after(delay, poll)
+
+    graph.show(delay=delay)
+    root.after(delay, poll)
+    root.mainloop()
+
+    for buffer in buffers.values():
+        buffer.close()
+
+    conn.close()
+
+
+class RemoteDataplot(object):
+    """Measurement side proxy of a dataplot in the plotting process.
+
+    """
+
+    def __init__(self, server, key, buffer):
+        self._server = server
+        self._key = key
+        self._buffer = buffer
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def dropped(self):
+        """Number of points the plotting process could not keep up with.
+
+        """
+        return self._buffer.dropped
+
+    def clear(self):
+        self._server._send('clear', self._key, self._buffer.count)
+
+    def configure(self, attribute, value):
+        """Set a dataplot attribute like 'line.color' in the plotting process.
+
+        """
+        self._server._send('configure', self._key, attribute.split('.'), value)
+
+
+class RemoteDataplot1d(RemoteDataplot):
+
+    def add_data(self, xdata, ydata):
+        """Add a list of data to the plot.
+
+        """
+        self._buffer.extend(xdata, ydata)
+
+
+class RemoteDataplot2d(RemoteDataplot):
+
+    def add_data(self, data):
+        """Add a list of data to the plot.
+
+        """
+        self._buffer.extend(data)
+
+    def new_line(self):
+        self._server._send('new_line', self._key, self._buffer.count)
+
+
+class PlotServer(object):
+    """LiveGraph running in a separate process.
+
+    The transfer buffers hold capacity points per dataplot. The plotting
+    process empties them every delay milliseconds, so capacity must exceed the
+    number of points added in that time.
+
+    """
+
+    def __init__(self, delay=50, style='pymeasure', shape=(), capacity=2**20, **fig_kwargs):
+        self._delay = int(delay)
+        self._style = style
+        self._shape = tuple(shape)
+        self._capacity = int(capacity)
+        self._fig_kwargs = fig_kwargs
+
+        self._process = None
+        self._conn = None
+        self._dataplots = dict()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def running(self):
+        """True if the plotting process is alive.
+
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the plotting process.
+
+        """
+
+        if self.running:
+            raise RuntimeError('plotserver is running.')
+
+        ctx = multiprocessing.get_context('spawn')
+        self._conn, child_conn = ctx.Pipe()
+
+        args = (child_conn, self._delay, self._style, self._shape, self._fig_kwargs)
+        self._process = ctx.Process(target=_serve, args=args, daemon=True)
+        self._process.start()
+
+    def _send(self, *command):
+        self._conn.send(command)
+
+    def _add_dataplot(self, cls, cmd, rows, key, args, length, kwargs):
+
+        if key in self._dataplots:
+            raise KeyError('dataplot exists.')
+
+        if length is None:
+            length = self._shape[-1]
+
+        buffer = SharedRingBuffer(rows, max(self._capacity, length))
+        kwargs['length'] = length
+
+        self._send(cmd, key, buffer.name, buffer.length, args, kwargs)
+        self._dataplots[key] = cls(self, key, buffer)
+
+        return self._dataplots[key]
+
+    def dataplot1d(self, key, axes, *plt_args, length=None, **plt_kwargs):
+        """Create a Dataplot1d in the plotting process.
+
+        Returns: RemoteDataplot1d
+        """
+        return self._add_dataplot(RemoteDataplot1d, 'dataplot1d', 2, key,
+                                  (axes,) + plt_args, length, plt_kwargs)
+
+    def dataplot2d(self, key, axes, *imshow, length=None, **kw_imshow):
+        """Create a Dataplot2d in the plotting process.
+
+        Returns: RemoteDataplot2d
+        """
+        return self._add_dataplot(RemoteDataplot2d, 'dataplot2d', 1, key,
+                                  (axes,) + imshow, length, kw_imshow)
+
+    def __getitem__(self, key):
+        return self._dataplots[key]
+
+    def snapshot(self, filename):
+        """Make a snapshot and save it as filename.
+
+        """
+        self._send('snapshot', filename)
+
+    def close(self, timeout=5):
+        """Stop the plotting process and release the transfer buffers.
+
+        """
+
+        if self.running:
+            self._send('close')
+            self._process.join(timeout)
+
+            if self._process.is_alive():
+                self._process.terminate()
+
+        for dataplot in self._dataplots.values():
+            dataplot._buffer.close()
+
+        self._dataplots.clear()
+        self._process = None
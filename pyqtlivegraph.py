@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from pymeasure.indexdict import IndexDict
+from pymeasure.taskqueue import TaskQueue
 import pyqtgraph as pg
 import pyqtgraph.exporters
 from pyqtgraph.Qt import QtGui, QtCore
 from queue import Queue
 import numpy as np
-from functools import partial
-from scipy.ndimage.interpolation import zoom
+import time
+from scipy.ndimage import affine_transform
 
 pg.setConfigOption('background', 'w')
 pg.setConfigOption('foreground', 'k')
@@ -16,39 +17,85 @@ pg.setConfigOption('foreground', 'k')
 class Manager:
     """Manager handels all graph changes sequential.
 
+    With coalesce=True pending add_data tasks of a plot get merged into one
+    data chunk and repeated property setters only keep their last value.
+    max_tasks limits the number of tasks processed per timer tick.
+
     """
 
     graphicswindow = None
     plotitem = None
 
-    def __init__(self):
-        self.tasks = Queue()
+    def __init__(self, coalesce=False, max_tasks=None):
+        self.tasks = TaskQueue(coalesce)
+        self.max_tasks = max_tasks
+        self.tick_time = 0
         self.running = False
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.process)
 
     @staticmethod
-    def task(method):
+    def task(method, mode=None):
         """Task decorator.
         """
 
         def task_method(self, *args, **kwargs):
-            task = (self, partial(method, self, *args, **kwargs))
-            self._manager.tasks.put(task)
+            self._manager.tasks.put(self, method.__get__(self), args, kwargs, mode)
+
+        return task_method
+
+    @staticmethod
+    def setter(method):
+        """Task decorator for property setters.
+
+        Only the last value of repeated calls gets processed.
+        """
+        return Manager.task(method, 'last')
+
+    @staticmethod
+    def data_task(method):
+        """Task decorator for methods adding data.
+
+        Pending data of plots appending the data (_appends is True) gets
+        merged into one chunk. Plots replacing their data only keep the
+        last pending data.
+        """
+
+        def task_method(self, *args, **kwargs):
+            mode = 'merge' if self._appends else 'last'
+            self._manager.tasks.put(self, method.__get__(self), args, kwargs, mode)
 
         return task_method
 
+    @property
+    def queue_depth(self):
+        """Number of pending tasks.
+        """
+        return len(self.tasks)
+
+    @property
+    def merged_tasks(self):
+        """Number of add_data tasks merged into a pending one.
+        """
+        return self.tasks.merged
+
+    @property
+    def dropped_tasks(self):
+        """Number of setter tasks replaced by a newer value.
+        """
+        return self.tasks.dropped
+
     def process(self):
-        """Process the all task in the input queue
+        """Process the tasks in the input queue
         """
 
+        start_time = time.perf_counter()
+
         self.graphs = []
 
-        # Execute all tasks
-        while not self.tasks.empty():
-            graph, task = self.tasks.get()
+        # Execute the pending tasks
+        for graph, task in self.tasks.get(self.max_tasks):
             task()
-            self.tasks.task_done()
 
             if graph not in self.graphs:
                 self.graphs.append(graph)
@@ -59,6 +106,8 @@ class Manager:
             except AttributeError:
                 pass
 
+        self.tick_time = time.perf_counter() - start_time
+
     def start(self, interval):
         self.timer.start(interval)
 
@@ -113,7 +162,7 @@ class LiveGraph(IndexDict):
         return self._gwin.windowTitle()
 
     @title.setter
-    @Manager.task
+    @Manager.setter
     def title(self, title):
         self._gwin.setWindowTitle(title)
 
@@ -138,7 +187,7 @@ class LiveGraph(IndexDict):
         return (width, height)
 
     @size.setter
-    @Manager.task
+    @Manager.setter
     def size(self, size):
         self._gwin.resize(*size)
 
@@ -168,6 +217,10 @@ class Line:
 
         self._curve = self._plotitem.plot(*args, **kwargs)
 
+        # Min/max envelope per pixel column of the visible data
+        self._curve.setClipToView(True)
+        self._curve.setDownsampling(auto=True, method='peak')
+
         # Transform pen string it pen opject
         self._curve.setPen(self._curve.opts['pen'])
         self._curve.setSymbolPen(self._curve.opts['symbolPen'])
@@ -180,7 +233,7 @@ class Line:
         self._ydata = []
 
 
-    @Manager.task
+    @Manager.data_task
     def add_data(self, xdata, ydata):
         """Add a list of data to the plot.
 
@@ -206,8 +259,13 @@ class Line:
 
     @Manager.task
     def clear(self):
-        del self._xdata[:]
-        del self._ydata[:]
+        self._xdata = []
+        self._ydata = []
+
+    @property
+    def _appends(self):
+        # Without length add_data replaces the displayed data
+        return bool(self._length)
 
     @property
     def continuously(self):
@@ -222,12 +280,28 @@ class Line:
     def update(self):
         self._curve.setData(np.array(self._xdata), np.array(self._ydata))
 
+    @property
+    def downsampling(self):
+        """Reduce the displayed data to a min/max envelope per pixel column.
+
+        pyqtgraph recomputes the envelope when the data or the view range
+        changes.
+
+        """
+        return self._curve.opts['autoDownsample']
+
+    @downsampling.setter
+    @Manager.setter
+    def downsampling(self, boolean):
+        self._curve.setClipToView(bool(boolean))
+        self._curve.setDownsampling(auto=bool(boolean), method='peak')
+
     @property
     def grid_x(self):
         return self._plotitem.ctrl.xGridCheck.isChecked()
 
     @grid_x.setter
-    @Manager.task
+    @Manager.setter
     def grid_x(self, boolean):
         self._plotitem.showGrid(x=boolean)
 
@@ -236,7 +310,7 @@ class Line:
         return self._plotitem.ctrl.yGridCheck.isChecked()
 
     @grid_y.setter
-    @Manager.task
+    @Manager.setter
     def grid_y(self, boolean):
         self._plotitem.showGrid(y=boolean)
 
@@ -245,7 +319,7 @@ class Line:
         return (self.grid_x, self.grid_y)
 
     @grid_xy.setter
-    @Manager.task
+    @Manager.setter
     def grid_xy(self, boolean):
         self._plotitem.showGrid(x=boolean, y=boolean)
 
@@ -254,7 +328,7 @@ class Line:
         return self._plotitem.vb.autoRangeEnabled()[0]
 
     @autorange_x.setter
-    @Manager.task
+    @Manager.setter
     def autorange_x(self, value):
         self._plotitem.vb.enableAutoRange('x', value)
 
@@ -263,7 +337,7 @@ class Line:
         return self._plotitem.vb.autoRangeEnabled()[1]
 
     @autorange_y.setter
-    @Manager.task
+    @Manager.setter
     def autorange_y(self, value):
         self._plotitem.vb.enableAutoRange('y', value)
 
@@ -272,7 +346,7 @@ class Line:
         return (self.autorange_x, self.autorange_y)
 
     @autorange_xy.setter
-    @Manager.task
+    @Manager.setter
     def autorange_xy(self, value):
         self._plotitem.vb.enableAutoRange('xy', value)
 
@@ -281,7 +355,7 @@ class Line:
         return self._curve.opts['symbol']
 
     @symbol.setter
-    @Manager.task
+    @Manager.setter
     def symbol(self, symbol):
         self._curve.setSymbol(symbol)
 
@@ -306,7 +380,7 @@ class Line:
         return self._get_color('pen')
 
     @line_color.setter
-    @Manager.task
+    @Manager.setter
     def line_color(self, color):
         self._set_color('pen', color)
 
@@ -315,7 +389,7 @@ class Line:
         return self._curve.opts['pen'].width()
 
     @line_width.setter
-    @Manager.task
+    @Manager.setter
     def line_width(self, width):
         self._curve.opts['pen'].setWidth(int(width))
 
@@ -326,7 +400,7 @@ class Line:
         return (line, brush)
 
     @symbol_color.setter
-    @Manager.task
+    @Manager.setter
     def symbol_color(self, color):
         self._set_color('symbolPen', color)
         self._set_color('symbolBrush', color)
@@ -336,7 +410,7 @@ class Line:
         return self._curve.opts['symbolSize']
 
     @symbol_size.setter
-    @Manager.task
+    @Manager.setter
     def symbol_size(self, size):
          self._curve.setSymbolSize(size)
 
@@ -345,7 +419,7 @@ class Line:
         return self._get_color('symbolPen')
 
     @symbol_line_color.setter
-    @Manager.task
+    @Manager.setter
     def symbol_line_color(self, color):
         self._set_color('symbolPen', color)
 
@@ -354,14 +428,40 @@ class Line:
         return self._get_color('symbolBrush')
 
     @symbol_brush_color.setter
-    @Manager.task
+    @Manager.setter
     def symbol_brush_color(self, color):
         self._set_color('symbolBrush', color)
 
 
+def _fill_missing(data, missing):
+    """Replace missing points by the last valid point of the same row.
+
+    Empty rows get the values of the previous row and leading empty rows
+    become zero. The filling only depends on the neighbouring points, so the
+    result does not change with the bounds of the interpolated rows.
+
+    """
+
+    rows, columns = data.shape
+
+    # Forward fill along the rows
+    index = np.where(missing, 0, np.arange(columns))
+    np.maximum.accumulate(index, axis=1, out=index)
+    data = data[np.arange(rows)[:, None], index]
+
+    # Forward fill empty rows with the previous row
+    empty = np.isnan(data[:, 0])
+    if empty.any():
+        index = np.where(empty, 0, np.arange(rows))
+        np.maximum.accumulate(index, out=index)
+        data = data[index]
+
+    return np.nan_to_num(data)
+
+
 class Image:
 
-    def __init__(self, *args, length=None, livegraph=None, plotitem=None, sidebar='histogram', colormap='thermal', **kwargs):
+    def __init__(self, *args, length=None, rows=None, livegraph=None, plotitem=None, sidebar='histogram', colormap='thermal', **kwargs):
 
         if livegraph:
             self._graph = livegraph
@@ -399,8 +499,24 @@ class Image:
 
         self._length = length
         self._qdata = Queue()
-        self._trace = []
-        self._data = np.array([[]])
+
+        # Preallocated backing array. Without rows the capacity gets doubled
+        # whenever it is exhausted.
+        self._rows = rows
+        if rows:
+            capacity = int(rows)
+        else:
+            capacity = 16
+        self._data = np.full((capacity, self._length), np.nan)
+
+        # Position of the next incoming point
+        self._row = 0
+        self._column = 0
+
+        # Rows changed since the last update as [start, stop)
+        self._dirty = None
+        self._zoomed = None
+        self._zoom_key = None
 
         self._tasks = 0
 
@@ -410,36 +526,154 @@ class Image:
         self.autolevel = True
 
 
-    @Manager.task
+    @Manager.data_task
     def add_data(self, data):
         """Add a list of data to the plot.
 
+        Incomplete traces are displayed as partial row.
+
         """
 
         if isinstance(data, Line):
             data = data._ydata[:]
 
-        self._trace.extend(data)
+        data = np.asarray(data, dtype=np.float64).ravel()
+
+        while data.size:
+
+            # Handle a filled backing array
+            if self._row == len(self._data):
+                if self._rows:
+                    # Start a new image
+                    self._data.fill(np.nan)
+                    self._row = 0
+                    self._mark_dirty(0, len(self._data))
+                else:
+                    # Double the capacity
+                    data_new = np.full((2 * len(self._data), self._length), np.nan)
+                    data_new[:len(self._data)] = self._data
+                    self._data = data_new
 
-        # Handle the maximum number of displayed points.
-        while len(self._trace) >= self._length:
+            # Write as many points as fit into the current row
+            points = min(data.size, self._length - self._column)
+            self._data[self._row, self._column:self._column + points] = data[:points]
+            self._mark_dirty(self._row, self._row + 1)
+            data = data[points:]
 
-            trace = self._trace[:self._length]
-            del self._trace[:self._length]
+            self._column += points
+            if self._column == self._length:
+                self._row += 1
+                self._column = 0
 
-            if self._data.size:
-                self._data = np.vstack((self._data, trace))
-            else:
-                self._data = np.array([trace])
+    # Added data gets appended to the rows of the image
+    _appends = True
 
+    @Manager.task
+    def clear(self):
+        self._data.fill(np.nan)
+        self._row = 0
+        self._column = 0
+        self._mark_dirty(0, len(self._data))
+
+    def _mark_dirty(self, start, stop):
+        if self._dirty is None:
+            self._dirty = [start, stop]
+        else:
+            self._dirty[0] = min(self._dirty[0], start)
+            self._dirty[1] = max(self._dirty[1], stop)
 
+    @property
+    def rows(self):
+        """Number of preallocated rows.
+
+        None means that the image grows with every added trace.
+
+        """
+        return self._rows
+
+    @property
+    def _visible(self):
+        """Number of displayed rows including the partial row.
+
+        """
+        if self._rows:
+            return self._rows
+        else:
+            return self._row + bool(self._column)
+
+    def _interpolate(self, visible, start, stop):
+        """Interpolate the rows between start and stop into the zoomed image.
+
+        The output pixel centers map to the input coordinates
+        (o + 0.5) / zoom - 0.5. That mapping does not depend on the number of
+        rows, so only the output rows next to the changed input rows have to be
+        recomputed. Missing points (NaN) of the partial row stay missing.
+
+        """
+
+        order = self._interpolation_mode
+        factor = self._interpolation_zoom
+        columns = int(round(self._length * factor))
+
+        # Reallocate the zoomed image and recompute everything on changes
+        key = (order, factor, self._data.shape)
+        if key != self._zoom_key:
+            rows = int(round(len(self._data) * factor))
+            self._zoomed = np.full((rows, columns), np.nan)
+            self._zoom_key = key
+            start, stop = 0, visible
+
+        rows = int(round(visible * factor))
+
+        # Affected output rows and the input rows they depend on. The spline
+        # prefilter has an infinite but quickly decaying response.
+        margin = 3 * order
+        out_start = max(0, int(np.floor((start - margin) * factor)))
+        out_stop = min(rows, int(np.ceil((stop + margin) * factor)))
+        in_start = max(0, start - 2 * margin)
+        in_stop = min(visible, stop + 2 * margin)
+
+        if out_stop > out_start and in_stop > in_start:
+            band = self._data[in_start:in_stop]
+
+            # Replace missing points before the spline filter spreads them
+            missing = np.isnan(band)
+            if missing.any():
+                band = _fill_missing(band, missing)
+
+            scale = self._length / columns
+            matrix = (1 / factor, scale)
+            offset = ((out_start + 0.5) / factor - 0.5 - in_start, 0.5 * scale - 0.5)
+            shape = (out_stop - out_start, columns)
+
+            zoomed = affine_transform(band, matrix, offset, shape, order=order,
+                                      mode='nearest')
+
+            if missing.any():
+                missing = affine_transform(missing.astype(np.float64), matrix,
+                                           offset, shape, order=0, mode='nearest')
+                zoomed[missing > 0.5] = np.nan
+
+            self._zoomed[out_start:out_stop] = zoomed
+
+        return self._zoomed[:rows]
 
     def update(self):
+        visible = self._visible
+
+        # Nothing to display or nothing changed since the last update
+        if not visible or self._dirty is None:
+            return
+
+        start, stop = self._dirty
+        self._dirty = None
+
         if self.interpolation_mode:
-            data = zoom(input=self._data, zoom=self.interpolation_zoom, order=self.interpolation_mode)
-            self._image.setImage(data.T)
+            data = self._interpolate(visible, start, min(stop, visible))
         else:
-            self._image.setImage(self._data.T)
+            data = self._data[:visible]
+
+        self._image.setImage(data.T)
 
         try:
             self._hist.imageChanged(autoLevel=self.autolevel)
@@ -455,7 +689,7 @@ class Image:
         self._gradient.getGradient()
 
     @gradient.setter
-    @Manager.task
+    @Manager.setter
     def gradient(self, key):
         self._gradient.loadPreset(key)
 
@@ -464,15 +698,17 @@ class Image:
         return self._interpolation_mode
 
     @interpolation_mode.setter
-    @Manager.task
+    @Manager.setter
     def interpolation_mode(self, mode):
         self._interpolation_mode = int(mode)
+        self._mark_dirty(0, len(self._data))
 
     @property
     def interpolation_zoom(self):
         return self._interpolation_zoom
 
     @interpolation_zoom.setter
-    @Manager.task
+    @Manager.setter
     def interpolation_zoom(self, factor):
-        self._interpolation_zoom = float(factor)
\ No newline at end of file
+        self._interpolation_zoom = float(factor)
+        self._mark_dirty(0, len(self._data))
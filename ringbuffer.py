@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.ringbuffer
+    --------------------
+
+    The module is part of the pymeasure package. It contains the RingBuffer
+    class, a fixed-capacity, preallocated numpy buffer for data streams. The
+    buffer keeps every value twice, which allows reading the buffered data
+    as a contiguous numpy view without copying it.
+
+"""
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """Preallocated ring buffer for one or several parallel data rows.
+
+    The buffer holds at most length points per row. Adding more points
+    overwrites the oldest ones. All rows are stored in one float64 array of
+    shape (rows, 2 * length) and every point gets written at index i and
+    i + length. That way the last len(buffer) points are always a contiguous
+    slice and can be returned as a view.
+
+    """
+
+    def __init__(self, length, rows=1, dtype=np.float64):
+        """Initiate RingBuffer class.
+
+        """
+
+        length = int(length)
+        if length < 1:
+            raise ValueError('length must be int >= 1.')
+
+        self._length = length
+        self._data = np.full((int(rows), 2 * length), np.nan, dtype=dtype)
+
+        # Next write position and number of valid points
+        self._index = 0
+        self._size = 0
+
+    def __len__(self):
+        """x.__len__() <==> len(x)
+
+        Return the number of points in the buffer.
+
+        """
+        return self._size
+
+    @property
+    def length(self):
+        """Maximum number of points in the buffer.
+
+        """
+        return self._length
+
+    @property
+    def rows(self):
+        """Number of parallel data rows.
+
+        """
+        return self._data.shape[0]
+
+    @property
+    def full(self):
+        """True if the buffer holds length points.
+
+        """
+        return self._size == self._length
+
+    def extend(self, *rows):
+        """Add the data of every row to the end of the buffer.
+
+        All rows must have the same number of points. If more than length
+        points get added only the last length points are kept.
+
+        """
+
+        if len(rows) != self.rows:
+            raise ValueError('number of rows does not match.')
+
+        rows = [np.asarray(row, dtype=self._data.dtype).ravel() for row in rows]
+        points = rows[0].size
+
+        if any(row.size != points for row in rows):
+            raise ValueError('rows have different length.')
+
+        if not points:
+            return
+
+        # Only the last length points can be stored
+        if points > self._length:
+            rows = [row[-self._length:] for row in rows]
+            self._index = (self._index + points - self._length) % self._length
+            points = self._length
+
+        # Write the points in at most two blocks, each one twice
+        index = self._index
+        first = min(points, self._length - index)
+        second = points - first
+
+        for data, row in zip(self._data, rows):
+            data[index:index + first] = row[:first]
+            data[index + self._length:index + self._length + first] = row[:first]
+            if second:
+                data[:second] = row[first:]
+                data[self._length:self._length + second] = row[first:]
+
+        self._index = (index + points) % self._length
+        self._size = min(self._size + points, self._length)
+
+    def clear(self):
+        """Remove all points from the buffer.
+
+        """
+        self._index = 0
+        self._size = 0
+
+    def view(self, row=None):
+        """Return the buffered data as a numpy view in chronological order.
+
+        Without row a view of shape (rows, len(buffer)) is returned. The view
+        is only valid until the buffer gets modified the next time.
+
+        """
+
+        start = (self._index - self._size) % self._length
+        data = self._data[:, start:start + self._size]
+
+        if row is None:
+            return data
+        else:
+            return data[row]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*
+
+"""
+    pymeasure.taskqueue
+    -------------------
+
+    The module is part of the pymeasure package. It contains the TaskQueue
+    class that transfers plotting tasks from the measurement thread to the
+    graphic thread of the liveplot and pyqtlivegraph managers.
+
+"""
+
+import numpy as np
+from collections import deque
+from functools import partial
+from threading import Lock
+
+
+class _Task(object):
+
+    __slots__ = ['owner', 'function', 'args', 'kwargs', 'chunks', 'key']
+
+    def __init__(self, owner, function, args, kwargs, key=None):
+        self.owner = owner
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.chunks = None
+        self.key = key
+
+    def callable(self):
+        """Return the task as callable without arguments.
+
+        Merged data chunks get concatenated into one contiguous array per
+        argument.
+
+        """
+
+        if self.chunks is None:
+            args = self.args
+        elif len(self.chunks) == 1:
+            args = self.chunks[0]
+        else:
+            args = tuple(np.concatenate(column) for column in zip(*self.chunks))
+
+        return partial(self.function, *args, **self.kwargs)
+
+
+def _copy(arg):
+    """Return a copy of array and list arguments, others are passed.
+
+    """
+    if isinstance(arg, np.ndarray):
+        return arg.copy()
+    elif isinstance(arg, list):
+        return list(arg)
+    else:
+        return arg
+
+
+class TaskQueue(object):
+    """Thread safe FIFO queue for (owner, task) pairs.
+
+    Every task has one of three modes:
+        None -- the task gets executed as it is.
+        'last' -- a pending task with the same function and keyword names
+                  gets replaced by the new arguments (property setters).
+        'merge' -- the arguments are data arrays and get concatenated with a
+                   pending task of the same function (add_data).
+
+    A task with mode None closes all pending tasks of the same owner, so data
+    added after e.g. a clear task does not get merged in front of it.
+    Without coalesce all tasks get executed one by one like in mode None.
+
+    """
+
+    def __init__(self, coalesce=False):
+        self._coalesce = bool(coalesce)
+        self._lock = Lock()
+        self._tasks = deque()
+        self._open = dict()
+
+        # Counters of coalesced tasks
+        self.merged = 0
+        self.dropped = 0
+
+    def __len__(self):
+        """x.__len__() <==> len(x)
+
+        Return the number of pending tasks.
+
+        """
+        return len(self._tasks)
+
+    @property
+    def coalesce(self):
+        """True if pending tasks get merged or replaced.
+
+        """
+        return self._coalesce
+
+    def put(self, owner, function, args=(), kwargs=None, mode=None):
+        """Add a task to the queue.
+
+        """
+
+        if kwargs is None:
+            kwargs = {}
+
+        if mode == 'merge':
+            # Take an independent copy of the data
+            if self._coalesce:
+                try:
+                    args = tuple(np.array(arg, dtype=np.float64).ravel() for arg in args)
+                except (TypeError, ValueError):
+                    mode = None
+            else:
+                args = tuple(_copy(arg) for arg in args)
+
+        if not self._coalesce:
+            mode = None
+
+        with self._lock:
+            if mode is None:
+                # Close pending tasks of the owner, later tasks must not be
+                # merged or replaced in front of this one
+                for key, task in list(self._open.items()):
+                    if task.owner is owner:
+                        del self._open[key]
+
+                self._tasks.append(_Task(owner, function, args, kwargs))
+                return
+
+            key = (mode, function, tuple(sorted(kwargs)))
+            task = self._open.get(key)
+
+            if task is None:
+                task = _Task(owner, function, args, kwargs, key)
+                if mode == 'merge':
+                    task.chunks = [args]
+                self._open[key] = task
+                self._tasks.append(task)
+            elif mode == 'merge':
+                task.chunks.append(args)
+                self.merged += 1
+            else:
+                task.args = args
+                task.kwargs = kwargs
+                self.dropped += 1
+
+    def get(self, max_tasks=None):
+        """Remove up to max_tasks tasks and return them as (owner, task).
+
+        """
+
+        tasks = []
+
+        with self._lock:
+            while self._tasks and (max_tasks is None or len(tasks) < max_tasks):
+                task = self._tasks.popleft()
+
+                if task.key is not None and self._open.get(task.key) is task:
+                    del self._open[task.key]
+
+                tasks.append(task)
+
+        return [(task.owner, task.callable()) for task in tasks]
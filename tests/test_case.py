@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*
+
+from pymeasure.case import Instrument, ChannelStep, ChannelWrite
+
+
+class StepChannel(ChannelStep):
+
+    def __init__(self):
+        super().__init__()
+        self.value = 0.
+
+    @ChannelStep._readmethod
+    def read(self):
+        return [self.value]
+
+    @ChannelStep._writemethod
+    def write(self, value):
+        self.value = value
+
+
+class PairChannel(ChannelWrite):
+
+    def __init__(self):
+        super().__init__()
+        self.values = (0., 0.)
+
+    @ChannelWrite._readmethod
+    def read(self):
+        return list(self.values)
+
+    @ChannelWrite._writemethod
+    def write(self, *values):
+        self.values = values
+
+
+class BatchInstrument(Instrument):
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self['step'] = StepChannel()
+        self['pair'] = PairChannel()
+
+    def _write_batch(self, pairs):
+        self.batches.append([(channel.name, value) for channel, value in pairs])
+        for channel, value in pairs:
+            channel.value = value
+
+
+def test_write_many_batch_with_multi_value_channel():
+    instrument = BatchInstrument()
+    instrument.write_many([('step', 1.5), ('pair', (2., 3.))])
+
+    assert instrument['step'].value == 1.5
+    assert instrument['pair'].values == (2., 3.)
+    assert instrument.batches == [[('step', 1.5)]]
+
+
+class UploadChannel(StepChannel):
+
+    def __init__(self):
+        super().__init__()
+        self.uploads = []
+
+    def _ramp_upload(self, values, steptime):
+        self.uploads.append(list(values))
+        self.value = values[-1]
+        return True
+
+
+def test_ramp_uses_upload_of_single_stepping_channel():
+    instrument = BatchInstrument()
+    instrument['upload'] = UploadChannel()
+    instrument['upload'].steptime = 1e-3
+    instrument['upload'].stepsize = 0.25
+
+    instrument.ramp([('upload', 1.), ('step', 0.5)])
+
+    assert instrument['upload'].uploads == [[0.25, 0.5, 0.75, 1.]]
+    assert instrument['upload'].value == 1.
+    assert instrument['step'].value == 0.5
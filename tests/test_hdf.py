@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*
+
+import numpy as np
+from pymeasure import hdf
+
+
+def test_float_slice_mmap(tmp_path):
+    filename = str(tmp_path / 'mmap.h5')
+
+    with hdf.File(filename, 'w') as f:
+        f.create_dataset('data', data=np.arange(10.), fillvalue=None)
+
+    for mmap in [False, True]:
+        with hdf.File(filename, 'r', mmap=mmap) as f:
+            data = f['data']
+            if mmap:
+                assert isinstance(data.as_memmap(), np.memmap)
+            assert np.array_equal(data[2.0:5.0], [2., 3., 4.])